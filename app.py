@@ -1,18 +1,41 @@
 import dash
-from dash import Dash, html, dcc, Input, Output, State, callback
+from dash import Dash, html, dcc, Input, Output, State, Patch, ClientsideFunction, callback, clientside_callback
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
+import functools
+import json
+import os
+import pandas as pd
 import sys
+import threading
 
 from layout.controls import build_sidebar
-from components.kpis import build_kpi_rows
-#from charts.emissions import emissions_overview_fig, emissions_stack_fig
-from charts.noise import noise_choropleth_fig, noise_hist_fig
-from charts.value import value_fig, pax_hist_fig, cargo_hist_fig
-from charts.employment import employment_fig
-from logic.model import DEFAULTS, PATHS, compute_all
-import geopandas as gpd
-
-noise = gpd.read_feather("data/lden.ftr")  # or .geojson/.shp
+from components.kpis import build_kpi_rows, kpi_value
+from logic import compare, model
+from logic.model import DEFAULTS, PATHS, SEGMENT_LABELS, compute_all, normalize_inputs
+from logic.optimize import pareto, solve
+from logic.sweep import heatmap, tornado
+from logic.trajectory import YEARS, to_frame, trajectory
+from logic.uncertainty import kpi_bands
+from logic.noise_data import data_version, noise_gdf
+from logic.scenario_store import DEFAULT_PATH as SCENARIO_DB, ScenarioStore
+from services.api import init_app as init_api
+from services.jobs import background_callback
+from services.metrics import init_app as init_metrics, span, timed
+from services.serialization import accepts_gzip, gzip_cached, init_app as init_serialization, typed_array
+
+# Startup mode, from MAINPORT_STARTUP:
+#   eager       load the data and build the layout at import (default; with
+#               gunicorn's preload_app the workers share all of it)
+#   lazy        import only what the callbacks need; the first page load
+#               imports the chart modules, loads the polygons and builds the
+#               figures
+#   background  like lazy, with that work started in a thread at import
+STARTUP = os.environ.get("MAINPORT_STARTUP", "eager")
+# Identifies the loaded noise data; the map layer and figure are cached under it
+NOISE_VERSION = data_version()
+# Weight the noise histogram by residents ("aantalInwoners") instead of counting polygons
+NOISE_HIST_WEIGHT = None
 # Columns expected:
 # - geometry (polygons)
 # - Lden (baseline Lden per polygon)  [optional but recommended]
@@ -21,67 +44,251 @@ noise = gpd.read_feather("data/lden.ftr")  # or .geojson/.shp
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
 app.title = "Airport Scenario Explorer"
 server = app.server
+init_metrics(server)  # spans, Server-Timing, /_metrics and on-demand profiles
+init_serialization(server)  # orjson, gzip for clients that accept it
+init_api(server, app.config.routes_pathname_prefix)  # /api/scenario(s) for other tools
+
+# The map geometry is served as a static, versioned GeoJSON file: the browser
+# caches it, and the layout only carries its URL.
+NOISE_GEOJSON_URL = app.get_relative_path(f"/_noise/{NOISE_VERSION}.geojson")
+
+# Shared scenarios (/share/<id>), in a SQLite file all workers use
+SCENARIO_STORE = ScenarioStore(os.environ.get("MAINPORT_SCENARIO_DB") or SCENARIO_DB)
+
+
+@server.route(f"{app.config.routes_pathname_prefix}_noise/<version>.geojson")
+def noise_geojson(version):
+    from flask import Response, abort, request
+    from charts.noise import noise_geojson_text
+    if version != NOISE_VERSION:
+        abort(404)
+    text = noise_geojson_text(noise_gdf(), NOISE_VERSION)
+    if accepts_gzip(request):
+        # Compressed once per data version; the tag matches what the client revalidates with
+        response = Response(gzip_cached(("noise", model.model_version()), text), mimetype="application/geo+json")
+        response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(NOISE_VERSION + "-gz")
+    else:
+        response = Response(text, mimetype="application/geo+json")
+        response.set_etag(NOISE_VERSION)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    return response.make_conditional(request)
+
+
+# --- Model results ---
+def scenario(slots, freight_pct, short_pct, medium_pct, path, biofuel_pct):
+    """Model result for the current inputs. compute_all caches per normalized
+    input tuple, so all callbacks of one interaction share one evaluation.
+    Do not modify it."""
+    with span("compute_all"):
+        return compute_all(slots, freight_pct, short_pct, medium_pct, path, biofuel_pct)
+
+
+def bands(slots, freight_pct, short_pct, medium_pct, path, biofuel_pct):
+    """P5/P50/P95 of the economic KPIs (logic.uncertainty), cached like `scenario`."""
+    with span("kpi_bands"):
+        return kpi_bands(slots, freight_pct, short_pct, medium_pct)
+
+
+def initial_scenario():
+    """The default scenario; figures in the layout start out at it and
+    callbacks then only patch them."""
+    return scenario(DEFAULTS["slots"], DEFAULTS["freight_share"], DEFAULTS["short_pct"], DEFAULTS["medium_pct"], DEFAULTS["path"],
+                    DEFAULTS["biofuel_pct"])
+
+
+@functools.lru_cache(maxsize=None)
+def build_layout():
+    """The page, built once per process. Chart modules (plotly.express,
+    geopandas) and the polygons are only needed from here on."""
+    from charts.noise import noise_choropleth_fig, noise_hist_fig
+    from charts.value import value_fig, pax_hist_fig, cargo_hist_fig
+    from charts.employment import employment_fig
+    from charts.emissions import emissions_overview_fig, emissions_stack_fig
+    from charts.sensitivity import METRIC_LABELS, PARAM_LABELS
+    from charts.compare import QUANTITY_LABELS, compare_map_fig
+
+    initial = initial_scenario()
+    noise = noise_gdf()
 
-# --- Layout pieces ---
-sidebar = build_sidebar(PATHS, DEFAULTS)
+    # --- Layout pieces ---
+    sidebar = build_sidebar(PATHS, DEFAULTS)
 
-header = dbc.Navbar(
-    dbc.Container([
-        html.Div("Airport Scenario Explorer", className="navbar-brand fw-bold mb-0"),
-        dbc.Input(id="scenario-name", placeholder="Scenario name…", value="My Airport Scenario", size="md", className="w-25 d-none d-md-block"),
+    header = dbc.Navbar(
+        dbc.Container([
+            html.Div("Airport Scenario Explorer", className="navbar-brand fw-bold mb-0"),
+            dbc.Input(id="scenario-name", placeholder="Scenario name…", value="My Airport Scenario", size="md", className="w-25 d-none d-md-block"),
+            html.Div([
+                dbc.Button("Share", id="btn-share", color="primary"),
+            ], className="ms-auto"),
+        ], fluid=True), color="white", dark=False, className="shadow-sm sticky-top"
+    )
+
+    kpi_bar, kpi_bar2 = build_kpi_rows()
+
+    content = dbc.Container([
+        kpi_bar,
+        kpi_bar2,
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="pax_stack", figure=pax_hist_fig(initial["seg"])), md=4),
+            dbc.Col(dcc.Graph(id="cargo_stack", figure=cargo_hist_fig(initial["seg"])), md=4),
+
+            dbc.Col(dcc.Graph(id="noise_hist", figure=noise_hist_fig(
+                noise[[NOISE_HIST_WEIGHT]].assign(Lden_sim=initial["lden_sim"]) if NOISE_HIST_WEIGHT else pd.DataFrame(dict(Lden_sim=initial["lden_sim"])),
+                version=NOISE_VERSION, weight_col=NOISE_HIST_WEIGHT)), md=4),
+        ], className="g-0 mb-0"),
+        dcc.Tabs(id="detail-tabs", value="tab-noise", children=[
+            dcc.Tab(label="Total emissions", value="tab-emissions", children=html.Div([
+                dbc.Row([
+                    dbc.Col(dcc.Graph(id="emissions_overview", figure=emissions_overview_fig(initial["seg"])), md=6),
+                    dbc.Col(dcc.Graph(id="emissions_stack", figure=emissions_stack_fig(initial["seg"])), md=6),
+                ]),
+            ], className="p-3")),
+            dcc.Tab(label="Noise map (Lden)", value="tab-noise", children=html.Div([
+                html.Div("KPI: number of homes affected shown above. Map below shows affected area's.", className="small text-muted mb-2"),
+                # Geometry is fetched once from NOISE_GEOJSON_URL; updates only patch the colors
+                dcc.Graph(id="noise_map", figure=noise_choropleth_fig(noise, color_col="Lden_sim", version=NOISE_VERSION, values=initial["lden_sim"], geojson_url=NOISE_GEOJSON_URL)),
+            ], className="p-3")),
+            dcc.Tab(label="Added value", value="tab-value", children=html.Div([dcc.Graph(id="value_chart", figure=value_fig(initial["seg"]))], className="p-3")),
+            dcc.Tab(label="Employment", value="tab-employment", children=html.Div([dcc.Graph(id="employment_chart", figure=employment_fig(initial["seg"]))], className="p-3")),
+            dcc.Tab(label="Sensitivity", value="tab-sensitivity", children=html.Div([
+                dbc.Row([
+                    dbc.Col([html.Label("Metric", className="fw-semibold small"),
+                             dcc.Dropdown(id="sens-metric", options=[{"label": v, "value": k} for k, v in METRIC_LABELS.items()], value="jobs_direct", clearable=False)], md=4),
+                    dbc.Col([html.Label("Heatmap x", className="fw-semibold small"),
+                             dcc.Dropdown(id="sens-x", options=[{"label": v, "value": k} for k, v in PARAM_LABELS.items()], value="freight_pct", clearable=False)], md=4),
+                    dbc.Col([html.Label("Heatmap y", className="fw-semibold small"),
+                             dcc.Dropdown(id="sens-y", options=[{"label": v, "value": k} for k, v in PARAM_LABELS.items()], value="short_pct", clearable=False)], md=4),
+                ], className="mb-2"),
+                html.Div("Tornado: each input varied on its own around the current scenario (slots ±20%, shares ±10 points).", className="small text-muted mb-2"),
+                html.Div([
+                    dbc.Button("Export full sweep (Parquet)", id="sens-export", color="secondary", outline=True, size="sm"),
+                    dbc.Button("Cancel", id="export-cancel", color="link", size="sm", className="d-none"),
+                    dbc.Progress(id="export-progress", value=0, className="d-none", style={"height": "16px"}),
+                ], className="d-flex gap-2 mb-2"),
+                dcc.Download(id="sens-download"),
+                dbc.Row([
+                    dbc.Col(dcc.Graph(id="sens_tornado"), md=6),
+                    dbc.Col(dcc.Graph(id="sens_heatmap"), md=6),
+                ]),
+            ], className="p-3")),
+            dcc.Tab(label="Trajectories", value="tab-trajectories", children=html.Div([
+                dbc.Row([
+                    dbc.Col([html.Label("Slot growth (% per year)", className="fw-semibold small"),
+                             dbc.Input(id="traj-growth", type="number", value=1.0, step=0.5)], md=2),
+                    dbc.Col([html.Label("Target year", className="fw-semibold small"),
+                             dbc.Input(id="traj-year", type="number", value=int(YEARS[-1]), min=int(YEARS[0]) + 1, max=int(YEARS[-1]), step=1)], md=2),
+                    dbc.Col([html.Label("Target freight (%)", className="fw-semibold small"),
+                             dbc.Input(id="traj-freight", type="number", min=0, max=100, step=1, placeholder="unchanged")], md=2),
+                    dbc.Col([html.Label("Target short-haul (%)", className="fw-semibold small"),
+                             dbc.Input(id="traj-short", type="number", min=0, max=100, step=1, placeholder="unchanged")], md=2),
+                    dbc.Col([html.Label("Target medium-haul (%)", className="fw-semibold small"),
+                             dbc.Input(id="traj-medium", type="number", min=0, max=100, step=1, placeholder="unchanged")], md=2),
+                    dbc.Col([html.Label("Target biofuel (%)", className="fw-semibold small"),
+                             dbc.Input(id="traj-biofuel", type="number", min=0, max=100, step=5, placeholder="unchanged")], md=2),
+                ], className="mb-2"),
+                dbc.Row([
+                    dbc.Col([html.Label("Metric", className="fw-semibold small"),
+                             dcc.Dropdown(id="traj-metric", options=[{"label": v, "value": k} for k, v in METRIC_LABELS.items()], value="va_direct", clearable=False)], md=4),
+                ], className="mb-2"),
+                html.Div(f"From the current inputs in {YEARS[0]} to {YEARS[-1]}: shares move linearly to their target by the target year; "
+                         "compared with growth only (shares unchanged) and with the current inputs held constant.", className="small text-muted mb-2"),
+                dbc.Row([
+                    dbc.Col(dcc.Graph(id="traj_metric"), md=6),
+                    dbc.Col(dcc.Graph(id="traj_mix"), md=6),
+                ]),
+            ], className="p-3")),
+            dcc.Tab(label="Compare", value="tab-compare", children=html.Div([
+                html.Div([
+                    dbc.Button("Pin current scenario", id="compare-pin", color="primary", size="sm"),
+                    dbc.Button("Clear", id="compare-clear", color="secondary", outline=True, size="sm"),
+                    html.Span(f"Up to {compare.MAX_PINNED} scenarios; the oldest is dropped.", className="small text-muted align-self-center"),
+                ], className="d-flex gap-2 mb-2"),
+                dcc.Store(id="compare-pins", data=[]),
+                html.Div(id="compare-table", className="small"),
+                dbc.Row([
+                    dbc.Col([html.Label("Segments", className="fw-semibold small"),
+                             dcc.Dropdown(id="compare-quantity", options=[{"label": v, "value": k} for k, v in QUANTITY_LABELS.items()], value="AddedValue", clearable=False),
+                             dcc.Graph(id="compare_segments")], md=6),
+                    dbc.Col([html.Label("Map reference", className="fw-semibold small"),
+                             dcc.Dropdown(id="compare-ref", options=[], placeholder="Pin a scenario"),
+                             dcc.Graph(id="compare_map", figure=compare_map_fig(noise, version=NOISE_VERSION, geojson_url=NOISE_GEOJSON_URL))], md=6),
+                ]),
+            ], className="p-3")),
+            dcc.Tab(label="Targets", value="tab-targets", children=html.Div([
+                dbc.Row([
+                    dbc.Col([html.Label("Max. people worse off", className="fw-semibold small"),
+                             dbc.Input(id="opt-max-worse", type="number", min=0, step=10000, placeholder="no limit")], md=3),
+                    dbc.Col([html.Label("Min. direct jobs", className="fw-semibold small"),
+                             dbc.Input(id="opt-min-jobs", type="number", min=0, step=10000, placeholder="no limit")], md=3),
+                    dbc.Col([html.Label("Min. direct added value (€m)", className="fw-semibold small"),
+                             dbc.Input(id="opt-min-va", type="number", min=0, step=1000, placeholder="no limit")], md=3),
+                    dbc.Col([html.Label("Maximize", className="fw-semibold small"),
+                             dcc.Dropdown(id="opt-objective", options=[{"label": "Slots", "value": "slots"}] + [
+                                 {"label": METRIC_LABELS[k], "value": k} for k in ("va_direct", "jobs_direct", "total_pax", "total_cargo_freight")
+                             ], value="slots", clearable=False)], md=3),
+                ], className="mb-2"),
+                html.Div([
+                    dbc.Button("Solve", id="opt-run", color="primary", size="sm"),
+                    dbc.Button("Apply best to inputs", id="opt-apply", color="secondary", outline=True, size="sm", disabled=True),
+                    dbc.Button("Cancel", id="opt-cancel", color="link", size="sm", className="d-none"),
+                    dbc.Progress(id="opt-progress", value=0, className="d-none", style={"height": "16px"}),
+                ], className="d-flex gap-2 mb-2"),
+                dcc.Store(id="opt-best"),
+                html.Div(id="opt-table", className="small"),
+                dcc.Graph(id="opt_pareto"),
+            ], className="p-3")),
+        ]),
+        html.Div(className="py-4"),
+    ], fluid=True)
+
+    right_info = html.Div([
+        dbc.Card([
+            dbc.CardHeader("Scenario Meta"),
+            dbc.CardBody([
+                html.Div("Name", className="small text-muted"),
+                html.Div(id="scenario-name-echo", className="fw-semibold"),
+                html.Hr(className="my-2"),
+                html.Div("Shareable link", className="small text-muted"),
+                html.Code(id="share-url", className="small"),
+            ])
+        ], className="shadow-sm")
+    ], style={"width": "320px", "position": "sticky", "top": "80px", "height": "calc(100vh - 100px)", "overflowY": "auto"})
+
+    return html.Div([
+        dcc.Location(id="url", refresh=False),  # /share/<id> restores a stored scenario
+        dcc.Store(id="defaults", data=DEFAULTS),  # read by the clientside reset
+        header,
         html.Div([
-            dbc.Button("Share", id="btn-share", color="primary"),
-        ], className="ms-auto"),
-    ], fluid=True), color="white", dark=False, className="shadow-sm sticky-top"
-)
+            sidebar,
+            html.Div([content], className="flex-grow-1"),
+            html.Div(right_info, className="d-none d-xl-block border-start bg-white p-3"),
+        ], className="d-flex", style={"minHeight": "100vh"})
+    ])
 
-kpi_bar, kpi_bar2 = build_kpi_rows()
-
-content = dbc.Container([
-    kpi_bar,
-    kpi_bar2,
-    dbc.Row([
-        dbc.Col(dcc.Graph(id="pax_stack"), md=4),
-        dbc.Col(dcc.Graph(id="cargo_stack"), md=4),
-
-        dbc.Col(dcc.Graph(id="noise_hist"), md=4),
-    ], className="g-0 mb-0"),
-    dcc.Tabs(id="detail-tabs", value="tab-noise", children=[
-        #dcc.Tab(label="Total emissions", value="tab-emissions", children=html.Div([dcc.Graph(id="emissions_overview")], className="p-3")),
-        dcc.Tab(label="Noise map (Lden)", value="tab-noise", children=html.Div([
-            html.Div("KPI: number of homes affected shown above. Map below shows affected area's.", className="small text-muted mb-2"),
-            dcc.Graph(id="noise_map"),
-        ], className="p-3")),
-        dcc.Tab(label="Added value", value="tab-value", children=html.Div([dcc.Graph(id="value_chart")], className="p-3")),
-        dcc.Tab(label="Employment", value="tab-employment", children=html.Div([dcc.Graph(id="employment_chart")], className="p-3")),
-    ]),
-    html.Div(className="py-4"),
-], fluid=True)
-
-right_info = html.Div([
-    dbc.Card([
-        dbc.CardHeader("Scenario Meta"),
-        dbc.CardBody([
-            html.Div("Name", className="small text-muted"),
-            html.Div(id="scenario-name-echo", className="fw-semibold"),
-            html.Hr(className="my-2"),
-            html.Div("Shareable link (placeholder)", className="small text-muted"),
-            html.Code(id="share-url", className="small"),
-        ])
-    ], className="shadow-sm")
-], style={"width": "320px", "position": "sticky", "top": "80px", "height": "calc(100vh - 100px)", "overflowY": "auto"})
-
-app.layout = html.Div([
-    header,
-    html.Div([
-        sidebar,
-        html.Div([content], className="flex-grow-1"),
-        html.Div(right_info, className="d-none d-xl-block border-start bg-white p-3"),
-    ], className="d-flex", style={"minHeight": "100vh"})
-])
+
+_layout_lock = threading.Lock()
+
+
+def serve_layout(**_):
+    with _layout_lock:  # a background warm-up and the first request build it once
+        return build_layout()
+
+
+if STARTUP == "eager":
+    app.layout = build_layout()
+else:
+    app.layout = serve_layout
+    if STARTUP == "background":
+        threading.Thread(target=serve_layout, name="mainport-warmup", daemon=True).start()
 
 # --- Callbacks ---
-@callback(
+# Presentational callbacks (value labels, split bar, name echo, sidebar toggle,
+# reset) run in the browser: see assets/clientside.js.
+clientside_callback(
+    ClientsideFunction(namespace="mainport", function_name="echo_inputs"),
     Output("freight_pct-val", "children"),
     Output("short_pct-val", "children"),
     Output("medium_pct-val", "children"),
@@ -92,15 +299,62 @@ app.layout = html.Div([
     Input("medium_pct", "value"),
 )
 
-def echo_inputs(freight, shortp, mediump):
-    from layout.controls import build_split_bar
-    freight = int(round(freight or 0)); shortp = int(round(shortp or 0)); mediump = int(round(mediump or 0))
-    longp = max(0, 100 - shortp - mediump)
-    bar = build_split_bar(shortp, mediump, longp)
-    return f"{freight}%", f"{shortp}%", f"{mediump}%", f"{longp}%", bar
+clientside_callback(
+    ClientsideFunction(namespace="mainport", function_name="echo_percent"),
+    Output("biofuel_pct-val", "children"),
+    Input("biofuel_pct", "value"),
+)
 
 
-@callback(
+# --- Model-driven outputs ---
+# Each output group declares the model inputs it depends on; the others are
+# passed as State, so moving an unrelated control does not fire the group.
+# `path` (its efficiency) and `biofuel_pct` only enter the emissions.
+MODEL_ARGS = ("slots", "freight_pct", "short_pct", "medium_pct", "path", "biofuel_pct")
+DEPENDS_ON = {
+    "kpis": ("slots", "freight_pct", "short_pct", "medium_pct"),
+    "segments": ("slots", "freight_pct", "short_pct", "medium_pct"),
+    "noise": ("slots", "freight_pct", "short_pct", "medium_pct"),
+    "sensitivity": ("slots", "freight_pct", "short_pct", "medium_pct"),
+    "trajectory": ("slots", "freight_pct", "short_pct", "medium_pct", "path", "biofuel_pct"),
+    "emissions": MODEL_ARGS,
+    "compare": MODEL_ARGS,
+}
+
+
+def model_callback(group, outputs, extra_inputs=None):
+    inputs = {k: Input(k, "value") for k in DEPENDS_ON[group]}
+    inputs.update(extra_inputs or {})
+    state = {k: State(k, "value") for k in MODEL_ARGS if k not in DEPENDS_ON[group]}
+    return callback(output=outputs, inputs=inputs, state=state)
+
+
+def _patch_bar(seg, col, band=None):
+    # The bar figures are in the layout already; send only the new bars
+    fig = Patch()
+    fig["data"][0]["x"] = seg["Segment"].tolist()
+    fig["data"][0]["y"] = seg[col].tolist()
+    if band is None:
+        fig["data"][0]["error_y"] = dict(visible=False)
+    else:
+        # band is (P5, P50, P95) x segments in SEGMENTS order; seg is sorted
+        order = [SEGMENT_LABELS.index(s) for s in seg["Segment"]]
+        fig["data"][0]["error_y"] = dict(
+            type="data", symmetric=False, visible=True,
+            array=(band[2][order] - seg[col].to_numpy()).clip(0).tolist(),
+            arrayminus=(seg[col].to_numpy() - band[0][order]).clip(0).tolist(),
+        )
+    return fig
+
+
+# KPI card -> model key and number format (bands are shown for the economic KPIs)
+KPI_FORMATS = dict(
+    va_direct="{:,.1f}", va_indirect="{:,.1f}", jobs_direct="{:,.0f}", jobs_indirect="{:,.0f}",
+    total_cargo_freight="{:,.2f}", total_cargo_belly="{:,.2f}", total_pax="{:,.2f}",
+)
+
+
+@model_callback("kpis", [
     #Output("fleet_warn", "children"),
     Output("kpi_homes", "children"),
     Output("kpi_va_direct", "children"),
@@ -110,69 +364,393 @@ def echo_inputs(freight, shortp, mediump):
     Output("total_cargo_freight", "children"),
     Output("total_cargo_belly", "children"),
     Output("total_pax", "children"),
+], extra_inputs=dict(uncertainty=Input("uncertainty", "value")))
+@timed("callback.update_kpis")
+def update_kpis(uncertainty, **inputs):
+    out = scenario(**inputs)
+
+    if uncertainty:
+        # P50 with the P5–P95 band; the noise KPI has no uncertain coefficients
+        b = bands(**inputs)
+        return [f"{out['homes']:,}"] + [
+            kpi_value(*(fmt.format(q) for q in (b[k][1], b[k][0], b[k][2]))) for k, fmt in KPI_FORMATS.items()
+        ]
+
+    return _kpi_texts(out)
+
+
+def _kpi_texts(out):
+    k_homes = f"{out['homes']:,}"; k_vad = f"{out['va_direct']:,.1f}"; k_vai = f"{out['va_indirect']:,.1f}"
+    k_jd = f"{out['jobs_direct']:,}"; k_ji = f"{out['jobs_indirect']:,}"
+    total_cargo_freight = f"{out['total_cargo_freight']:,}"; total_cargo_belly = f"{out['total_cargo_belly']:,}"; total_pax = f"{out['total_pax']:,}"
+    return [k_homes, k_vad, k_vai, k_jd, k_ji, total_cargo_freight, total_cargo_belly, total_pax]
+
+
+@model_callback("segments", [
     Output("pax_stack", "figure"),
     Output("cargo_stack", "figure"),
-    Output("noise_map", "figure"),
     Output("value_chart", "figure"),
     Output("employment_chart", "figure"),
+], extra_inputs=dict(uncertainty=Input("uncertainty", "value")))
+@timed("callback.update_segment_charts")
+def update_segment_charts(uncertainty, **inputs):
+    seg = scenario(**inputs)["seg"]
+    b = bands(**inputs) if uncertainty else {}
+    return [_patch_bar(seg, col, b.get(key)) for col, key in
+            (("Pax", "seg_pax"), ("Cargo", "seg_cargo"), ("AddedValue", "seg_added_value"), ("Jobs", "seg_jobs"))]
+
+
+@model_callback("emissions", [
+    Output("emissions_overview", "figure"),
+    Output("emissions_stack", "figure"),
+], extra_inputs=dict(tab=Input("detail-tabs", "value")))
+@timed("callback.update_emissions")
+def update_emissions(tab, **inputs):
+    # Same cached evaluation as the KPIs; drawn while the tab is open
+    if tab != "tab-emissions":
+        raise PreventUpdate
+    from charts.emissions import emissions_overview_fig, emissions_stack_fig
+    seg = scenario(**inputs)["seg"]
+    return [emissions_overview_fig(seg), emissions_stack_fig(seg)]
+
+
+@model_callback("noise", [
+    Output("noise_map", "figure"),
     Output("noise_hist", "figure"),
-    Input("slots", "value"),
-    Input("freight_pct", "value"),
-    Input("short_pct", "value"),
-    Input("medium_pct", "value"),
-    Input("path", "value"),
+])
+@timed("callback.update_noise")
+def update_noise(**inputs):
+    levels = scenario(**inputs)["lden_sim"]
+    # Polygons and layout are already on the client: only send the new levels
+    fig_noise = Patch()
+    fig_noise["data"][0]["z"] = typed_array(levels)
+    # and the histogram's 40 bins, binned on the version's fixed grid
+    from charts.noise import hist_counts
+    weights = noise_gdf()[NOISE_HIST_WEIGHT].to_numpy() if NOISE_HIST_WEIGHT else None
+    centers, counts, _ = hist_counts(levels, NOISE_VERSION, weights)
+    fig_hist = Patch()
+    fig_hist["data"][0]["x"] = typed_array(centers, "f8")
+    fig_hist["data"][0]["y"] = typed_array(counts, "f8")
+    return [fig_noise, fig_hist]
+
+
+# Axes of the sensitivity heatmap
+SWEEP_AXES = dict(
+    slots=range(100_000, 800_001, 25_000),
+    freight_pct=range(0, 101, 2),
+    short_pct=range(0, 101, 2),
+    medium_pct=range(0, 101, 2),
 )
-def update_all(slots, freight, shortp, mediump, path):
-    out = compute_all(slots, freight, shortp, mediump, path)
 
-    k_homes = f"{out['homes']:,}"; k_vad = f"{out['va_direct']:,.1f}"; k_vai = f"{out['va_indirect']:,.1f}"
-    k_jd = f"{out['jobs_direct']:,}"; k_ji = f"{out['jobs_indirect']:,}"
-    total_cargo_freight = f"{out['total_cargo_freight']:,}"; total_cargo_belly = f"{out['total_cargo_belly']:,}"; total_pax = f"{out['total_pax']:,}"
 
-    seg = out["seg"].copy()
-    #fig_em_over = emissions_overview_fig(seg)
-    fig_pax = pax_hist_fig(seg) 
-    cargo_pax = cargo_hist_fig(seg) 
+def _tornado_ranges(base):
+    ranges = dict(slots=(int(base["slots"] * 0.8), int(base["slots"] * 1.2)))
+    for p in ("freight_pct", "short_pct", "medium_pct"):
+        ranges[p] = (max(0, base[p] - 10), min(100, base[p] + 10))
+    return ranges
+
+
+@model_callback("sensitivity", [
+    Output("sens_tornado", "figure"),
+    Output("sens_heatmap", "figure"),
+], extra_inputs=dict(tab=Input("detail-tabs", "value"), metric=Input("sens-metric", "value"),
+                     x=Input("sens-x", "value"), y=Input("sens-y", "value")))
+@timed("callback.update_sensitivity")
+def update_sensitivity(tab, metric, x, y, **inputs):
+    # Only evaluated while the tab is open
+    if tab != "tab-sensitivity":
+        raise PreventUpdate
+    base = dict(zip(MODEL_ARGS, normalize_inputs(*(inputs[k] for k in MODEL_ARGS))))
+    from charts.sensitivity import heatmap_fig, tornado_fig
+    with span("sweep"):
+        fig_tornado = tornado_fig(tornado(_tornado_ranges(base), metric, base), metric)
+        grid = heatmap(x, SWEEP_AXES[x], y, SWEEP_AXES[y], metric, base) if x != y else None
+    return [fig_tornado, heatmap_fig(grid, metric)]
+
+
+# Bulk export of a four-parameter sweep around the current scenario, with
+# every KPI; runs as a background job and streams the chunks into Parquet
+EXPORT_AXES = dict(
+    slots=range(100_000, 800_001, 25_000),
+    freight_pct=range(0, 101, 5),
+    short_pct=range(0, 101, 5),
+    medium_pct=range(0, 101, 5),
+)
+
+
+@background_callback(
+    output=Output("sens-download", "data"),
+    inputs=dict(n=Input("sens-export", "n_clicks")),
+    state={k: State(k, "value") for k in MODEL_ARGS},
+    progress=[Output("export-progress", "value"), Output("export-progress", "label")],
+    running=[(Output("sens-export", "disabled"), True, False), (Output("export-cancel", "className"), "", "d-none"),
+             (Output("export-progress", "className"), "flex-grow-1 align-self-center", "d-none")],
+    cancel=[Input("export-cancel", "n_clicks")],
+    prevent_initial_call=True,
+)
+@timed("callback.export_sweep")
+def export_sweep(set_progress, n, **inputs):
+    import io
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from logic.sweep import CHUNK_SIZE, iter_sweep
+    base = dict(zip(MODEL_ARGS, normalize_inputs(*(inputs[k] for k in MODEL_ARGS))))
+    total = 1
+    for values in EXPORT_AXES.values():
+        total *= len(values)
+    sink, writer, done = io.BytesIO(), None, 0
+    for df in iter_sweep(EXPORT_AXES, base, CHUNK_SIZE):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = writer or pq.ParquetWriter(sink, table.schema, compression="zstd")
+        writer.write_table(table)
+        done += len(df)
+        set_progress((100 * done // total, f"{done:,} / {total:,}"))
+    writer.close()
+    return dcc.send_bytes(sink.getvalue(), "mainport_sweep.parquet")
+
+
+# Trajectories: the scenario with its targets next to growth only and the
+# current inputs held constant, all years of the three in one batch pass
+TRAJECTORY_SCENARIOS = ("With targets", "Growth only", "Constant")
+
+
+@model_callback("trajectory", [
+    Output("traj_metric", "figure"),
+    Output("traj_mix", "figure"),
+], extra_inputs=dict(tab=Input("detail-tabs", "value"), metric=Input("traj-metric", "value"),
+                     growth=Input("traj-growth", "value"), target_year=Input("traj-year", "value"),
+                     freight=Input("traj-freight", "value"), short=Input("traj-short", "value"),
+                     medium=Input("traj-medium", "value"), biofuel=Input("traj-biofuel", "value")))
+@timed("callback.update_trajectories")
+def update_trajectories(tab, metric, growth, target_year, freight, short, medium, biofuel, **inputs):
+    # Only evaluated while the tab is open
+    if tab != "tab-trajectories":
+        raise PreventUpdate
+    slots, freight_pct, short_pct, medium_pct, path, biofuel_pct = normalize_inputs(*(inputs[k] for k in MODEL_ARGS))
+    growth = growth or 0
+
+    def target(value, start):
+        return start if value is None else [value, start, start]
+
+    from charts.trajectory import fleet_mix_fig, trajectory_fig
+    if (short_pct if short is None else short) + (medium_pct if medium is None else medium) > 100:
+        # The long-haul share is what is left of short + medium
+        message = "Short- and medium-haul targets add up to more than 100%"
+        return [trajectory_fig(None).update_layout(title=message), trajectory_fig(None)]
+    with span("trajectory"):
+        result = trajectory(
+            slots, freight_pct, short_pct, medium_pct, slot_growth=[growth, growth, 0],
+            target_freight_pct=target(freight, freight_pct), target_short_pct=target(short, short_pct),
+            target_medium_pct=target(medium, medium_pct), biofuel_pct=biofuel_pct,
+            target_biofuel_pct=target(biofuel, biofuel_pct), target_year=target_year or YEARS[-1], path_name=path,
+        )
+    return [trajectory_fig(to_frame(result, TRAJECTORY_SCENARIOS), metric),
+            fleet_mix_fig(result["year"], result["seg_slots"][0], title="Slots per segment (with targets)")]
+
+
+# Compare: pinned scenarios are evaluated once (logic.compare.PINNED); the
+# active one comes from the model cache and only the differences are new
+COMPARE_COLUMNS = dict(va_direct=("Added value (€m)", "{:+,.1f}"), jobs_direct=("Direct jobs", "{:+,.0f}"),
+                       total_pax=("Passengers (m)", "{:+,.2f}"), co2=("CO₂ (Mt)", "{:+,.2f}"),
+                       people_worse=("People worse off", "{:+,.0f}"), noise_delta=("Lden (dB)", "{:+.2f}"))
 
-    fig_noise = noise_choropleth_fig(noise, color_col="Lden_sim") 
-    fig_hist = noise_hist_fig(noise)
-    fig_val = value_fig(seg)
-    fig_emp = employment_fig(seg)
 
-    return (
-        k_homes, k_vad, k_vai, k_jd, k_ji, total_cargo_freight, total_cargo_belly, total_pax,
-        fig_pax,cargo_pax, fig_noise, fig_val, fig_emp, fig_hist,
+@callback(
+    output=dict(pins=Output("compare-pins", "data"), options=Output("compare-ref", "options"), ref=Output("compare-ref", "value")),
+    inputs=dict(pin=Input("compare-pin", "n_clicks"), clear=Input("compare-clear", "n_clicks")),
+    state=dict(pins=State("compare-pins", "data"), ref=State("compare-ref", "value"), name=State("scenario-name", "value"),
+               **{k: State(k, "value") for k in MODEL_ARGS}),
+    prevent_initial_call=True,
+)
+@timed("callback.update_pins")
+def update_pins(pin, clear, pins, ref, name, **inputs):
+    pins = [] if dash.ctx.triggered_id == "compare-clear" else list(pins or [])
+    if dash.ctx.triggered_id == "compare-pin":
+        key = list(normalize_inputs(*(inputs[k] for k in MODEL_ARGS)))
+        pins = [p for p in pins if p["inputs"] != key]
+        pins = (pins + [dict(name=name or f"Scenario {len(pins) + 1}", inputs=key)])[-compare.MAX_PINNED:]
+        with span("compare.pin"):
+            compare.pinned([key])  # evaluated once, now
+    options = [{"label": p["name"], "value": i} for i, p in enumerate(pins)]
+    return dict(pins=pins, options=options, ref=(ref if ref is not None and ref < len(pins) else (0 if pins else None)))
+
+
+@model_callback("compare", [
+    Output("compare-table", "children"),
+    Output("compare_segments", "figure"),
+    Output("compare_map", "figure"),
+], extra_inputs=dict(tab=Input("detail-tabs", "value"), pins=Input("compare-pins", "data"),
+                     ref=Input("compare-ref", "value"), quantity=Input("compare-quantity", "value")))
+@timed("callback.update_compare")
+def update_compare(tab, pins, ref, quantity, **inputs):
+    # Only evaluated while the tab is open
+    if tab != "tab-compare":
+        raise PreventUpdate
+    from charts.compare import compare_segments_fig
+    pins = pins or []
+    active = compare.summary(scenario(**inputs))
+    with span("compare"):
+        others = compare.pinned([p["inputs"] for p in pins])
+        diff = compare.differences(active, others)
+    q = list(compare.SEGMENT_QUANTITIES).index(quantity)
+    fig_segments = compare_segments_fig(active["seg"][:, q], diff["pinned_seg"][:, :, q], [p["name"] for p in pins], quantity)
+
+    fig_map = dash.no_update
+    levels = compare.lden_difference(active, others[ref]) if pins and ref is not None and ref < len(pins) else []
+    if len(levels):
+        # The map is in the layout already: send the differences and color range
+        bound = max(float(abs(levels).max()), 0.1)
+        fig_map = Patch()
+        fig_map["data"][0]["z"] = typed_array(levels)
+        fig_map["layout"]["coloraxis"]["cmin"] = -bound
+        fig_map["layout"]["coloraxis"]["cmax"] = bound
+        fig_map["layout"]["title"]["text"] = f"Lden difference with {pins[ref]['name']}"
+    if not pins:
+        return html.Div("Pin scenarios to compare them with the current inputs.", className="text-muted"), fig_segments, fig_map
+    idx = [compare.METRICS.index(k) for k in COMPARE_COLUMNS]
+    table = pd.DataFrame(
+        [[p["name"]] + [fmt.format(v) for (_, fmt), v in zip(COMPARE_COLUMNS.values(), row[idx])]
+         for p, row in zip(pins, diff["metrics"])],
+        columns=["Current minus"] + [label for label, _ in COMPARE_COLUMNS.values()],
     )
+    return dbc.Table.from_dataframe(table, striped=True, bordered=False, hover=True, size="sm", className="mb-2"), fig_segments, fig_map
+
+
+# Targets: the solver searches slots and shares under KPI constraints
+OPT_COLUMNS = dict(slots="Slots", freight_pct="Freight %", short_pct="Short %", medium_pct="Medium %",
+                   va_direct="Added value (€m)", jobs_direct="Direct jobs", people_worse="People worse off")
+
+
+@background_callback(
+    output=[Output("opt-table", "children"), Output("opt_pareto", "figure"), Output("opt-best", "data"),
+            Output("opt-apply", "disabled")],
+    inputs=[Input("opt-run", "n_clicks")],
+    state=[State("opt-max-worse", "value"), State("opt-min-jobs", "value"), State("opt-min-va", "value"),
+           State("opt-objective", "value")],
+    progress=[Output("opt-progress", "value"), Output("opt-progress", "label")],
+    running=[(Output("opt-run", "disabled"), True, False), (Output("opt-cancel", "className"), "", "d-none"),
+             (Output("opt-progress", "className"), "flex-grow-1 align-self-center", "d-none")],
+    cancel=[Input("opt-cancel", "n_clicks")],
+    prevent_initial_call=True,
+)
+@timed("callback.update_targets")
+def update_targets(set_progress, n, max_worse, min_jobs, min_va, objective):
+    constraints = {}
+    if max_worse is not None:
+        constraints["people_worse"] = (None, max_worse)
+    if min_jobs is not None:
+        constraints["jobs_direct"] = (min_jobs, None)
+    if min_va is not None:
+        constraints["va_direct"] = (min_va, None)
+    from charts.optimize import pareto_fig
+    with span("solve"):
+        set_progress((10, "Solving…"))
+        best = solve(constraints, objective)
+        set_progress((40, "Pareto frontier…"))
+        frontier = pareto(constraints)
+    if best.empty:
+        return html.Div("No scenario meets these targets.", className="text-danger"), pareto_fig(frontier), None, True
+    table = best[list(OPT_COLUMNS)].rename(columns=OPT_COLUMNS).round(1)
+    return (dbc.Table.from_dataframe(table, striped=True, bordered=False, hover=True, size="sm", className="mb-2"),
+            pareto_fig(frontier, best=best), {k: int(best.iloc[0][k]) for k in list(OPT_COLUMNS)[:4]}, False)
+
 
 @callback(
+    Output("slots", "value", allow_duplicate=True),
+    Output("freight_pct", "value", allow_duplicate=True),
+    Output("short_pct", "value", allow_duplicate=True),
+    Output("medium_pct", "value", allow_duplicate=True),
+    Input("opt-apply", "n_clicks"),
+    State("opt-best", "data"),
+    prevent_initial_call=True,
+)
+def apply_target(n, best):
+    if not best:
+        raise PreventUpdate
+    return [best["slots"], best["freight_pct"], best["short_pct"], best["medium_pct"]]
+
+
+# --- Shared scenarios ---
+# Sharing stores the inputs with the model result and the rendered KPIs and
+# charts under a content hash; /share/<id> puts them back without recomputing.
+KPI_OUTPUTS = ("kpi_homes", "kpi_va_direct", "kpi_va_indirect", "kpi_jobs_direct", "kpi_jobs_indirect",
+               "total_cargo_freight", "total_cargo_belly", "total_pax")
+FIGURE_OUTPUTS = ("pax_stack", "cargo_stack", "value_chart", "employment_chart", "emissions_overview", "emissions_stack")
+
+
+@callback(
+    output=Output("share-url", "children"),
+    inputs=dict(n=Input("btn-share", "n_clicks")),
+    state=dict(name=State("scenario-name", "value"), **{k: State(k, "value") for k in MODEL_ARGS}),
+    prevent_initial_call=True,
+)
+@timed("callback.share_scenario")
+def share_scenario(n, name, **inputs):
+    from flask import request
+    import plotly.io as pio
+    from charts.value import value_fig, pax_hist_fig, cargo_hist_fig
+    from charts.employment import employment_fig
+    from charts.emissions import emissions_overview_fig, emissions_stack_fig
+    builders = dict(pax_stack=pax_hist_fig, cargo_stack=cargo_hist_fig, value_chart=value_fig, employment_chart=employment_fig,
+                    emissions_overview=emissions_overview_fig, emissions_stack=emissions_stack_fig)
+    key = normalize_inputs(*(inputs[k] for k in MODEL_ARGS))
+    out = scenario(**inputs)
+    outputs = dict(
+        kpis=_kpi_texts(out),
+        figures={cid: pio.to_json(builders[cid](out["seg"]), validate=False) for cid in FIGURE_OUTPUTS},
+    )
+    with span("store_scenario"):
+        sid = SCENARIO_STORE.save(key, name, model.model_version(), out, outputs)
+    return request.host_url.rstrip("/") + app.get_relative_path(f"/share/{sid}")
+
+
+@callback(
+    [Output(k, "value", allow_duplicate=True) for k in MODEL_ARGS] + [Output("scenario-name", "value")]
+    + [Output(k, "children", allow_duplicate=True) for k in KPI_OUTPUTS]
+    + [Output(k, "figure", allow_duplicate=True) for k in FIGURE_OUTPUTS],
+    Input("url", "pathname"),
+    prevent_initial_call="initial_duplicate",
+)
+@timed("callback.restore_scenario")
+def restore_scenario(pathname):
+    parts = app.strip_relative_path(pathname or "").split("/")
+    if len(parts) != 2 or parts[0] != "share":
+        raise PreventUpdate
+    stored = SCENARIO_STORE.load(parts[1], model.model_version())
+    if stored is None:
+        raise PreventUpdate
+    inputs = list(normalize_inputs(*stored["inputs"]))  # links from before biofuel_pct get its default
+    if "result" not in stored:
+        # Shared with other model inputs: restore the sliders and recompute
+        return inputs + [stored["name"]] + [dash.no_update] * (len(KPI_OUTPUTS) + len(FIGURE_OUTPUTS))
+    # The slider callbacks that follow find the stored result in the cache
+    model.remember(inputs, stored["result"])
+    figures = stored["outputs"]["figures"]
+    return (inputs + [stored["name"]] + stored["outputs"]["kpis"]
+            + [json.loads(figures[k]) for k in FIGURE_OUTPUTS])
+
+
+clientside_callback(
+    ClientsideFunction(namespace="mainport", function_name="reset_inputs"),
     Output("slots", "value"),
     Output("freight_pct", "value"),
     Output("short_pct", "value"),
     Output("medium_pct", "value"),
     Output("path", "value"),
+    Output("biofuel_pct", "value"),
     Input("btn-reset", "n_clicks"),
+    State("defaults", "data"),
     prevent_initial_call=True,
 )
 
-def reset_inputs(n):
-    return (
-        DEFAULTS["slots"],
-        DEFAULTS["freight_share"],
-        DEFAULTS["short_pct"],
-        DEFAULTS["medium_pct"],
-        DEFAULTS["path"],
-    )
-
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace="mainport", function_name="echo_name"),
     Output("scenario-name-echo", "children"),
-    Output("share-url", "children"),
     Input("scenario-name", "value"),
 )
 
-def echo_name(name):
-    return name or "My Airport Scenario", f"/share/{(name or 'my-airport-scenario').lower().replace(' ', '-') }"
-
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace="mainport", function_name="toggle_sidebar"),
     Output("sidebar", "style"),
     Output("btn-show-sidebar", "style"),
     Input("btn-hide-sidebar", "n_clicks"),
@@ -182,18 +760,5 @@ def echo_name(name):
     prevent_initial_call=True,
 )
 
-def toggle_sidebar(n_hide, n_show, sidebar_style, showbtn_style):
-    ctx = dash.callback_context
-    sidebar_style = sidebar_style or {}
-    showbtn_style = showbtn_style or {"position": "fixed", "top": "80px", "left": "10px", "zIndex": 2000, "display": "none"}
-    if not ctx.triggered:
-        return sidebar_style, showbtn_style
-    trigger = ctx.triggered[0]["prop_id"].split(".")[0]
-    if trigger == "btn-hide-sidebar":
-        sidebar_style["display"] = "none"; showbtn_style["display"] = "block"
-    else:
-        sidebar_style["display"] = "block"; showbtn_style["display"] = "none"
-    return sidebar_style, showbtn_style
-
 if __name__ == "__main__":
     app.run(debug=True)
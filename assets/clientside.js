@@ -0,0 +1,76 @@
+// Clientside versions of the purely presentational callbacks in app.py.
+// They mirror the former Python implementations output for output, so the
+// server only handles model evaluation.
+(function () {
+    // int(round(v or 0)) in Python: halves round to the nearest even integer
+    function toInt(v) {
+        v = v || 0;
+        var r = Math.round(v);
+        if (Math.abs(v % 1) === 0.5) {
+            r = 2 * Math.round(v / 2);
+        }
+        return r === 0 ? 0 : r;
+    }
+
+    // Same component tree as layout.controls.build_split_bar
+    function splitBar(shortp, mediump, longp) {
+        function bar(value, color, label) {
+            return {
+                namespace: "dash_bootstrap_components",
+                type: "Progress",
+                props: {children: null, value: value, color: color, bar: true, label: label},
+            };
+        }
+        return {
+            namespace: "dash_bootstrap_components",
+            type: "Progress",
+            props: {
+                children: [
+                    bar(shortp, "success", "Short " + shortp + "%"),
+                    bar(mediump, "warning", "Medium " + mediump + "%"),
+                    bar(longp, "danger", "Long " + longp + "%"),
+                ],
+                striped: false,
+                animated: false,
+            },
+        };
+    }
+
+    var mainport = {
+        echo_inputs: function (freight, shortp, mediump) {
+            freight = toInt(freight); shortp = toInt(shortp); mediump = toInt(mediump);
+            var longp = Math.max(0, 100 - shortp - mediump);
+            return [freight + "%", shortp + "%", mediump + "%", longp + "%", splitBar(shortp, mediump, longp)];
+        },
+
+        echo_percent: function (value) {
+            return toInt(value) + "%";
+        },
+
+        echo_name: function (name) {
+            return name || "My Airport Scenario";
+        },
+
+        reset_inputs: function (n, defaults) {
+            return [defaults.slots, defaults.freight_share, defaults.short_pct, defaults.medium_pct, defaults.path, defaults.biofuel_pct];
+        },
+
+        toggle_sidebar: function (n_hide, n_show, sidebar_style, showbtn_style) {
+            var ctx = window.dash_clientside.callback_context;
+            sidebar_style = Object.assign({}, sidebar_style || {});
+            showbtn_style = Object.assign({}, showbtn_style || {position: "fixed", top: "80px", left: "10px", zIndex: 2000, display: "none"});
+            if (!ctx || !ctx.triggered || !ctx.triggered.length) {
+                return [sidebar_style, showbtn_style];
+            }
+            var trigger = ctx.triggered[0].prop_id.split(".")[0];
+            if (trigger === "btn-hide-sidebar") {
+                sidebar_style.display = "none"; showbtn_style.display = "block";
+            } else {
+                sidebar_style.display = "block"; showbtn_style.display = "none";
+            }
+            return [sidebar_style, showbtn_style];
+        },
+    };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {mainport: mainport});
+})();
@@ -0,0 +1,172 @@
+"""Equivalence check of assets/clientside.js against the Python callbacks it replaced.
+
+Run from the repository root (needs node on the PATH):
+
+    python bench/check_clientside.py
+
+The presentational callbacks (value labels and haul split bar, scenario name
+echo, reset, sidebar toggle) used to run on the server. REFERENCE below keeps
+their Python logic as it is meant to behave today: echo_name returns only
+the name since shared links are made by share_scenario, reset_inputs also
+resets biofuel_pct, and echo_percent labels the biofuel slider. The same
+inputs, including None, fractions and halves (round half to even), go
+through the JS functions under node and through REFERENCE; any difference
+is printed and the script exits with status 1.
+
+The split bar is compared as the component JSON Dash sends to the browser;
+props that are None are left out on both sides, as the renderer treats a
+missing prop and null alike. When dash is installed, REFERENCE's split bar
+is also checked against layout.controls.build_split_bar itself.
+"""
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from logic.model import DEFAULTS  # noqa: E402
+
+SHOWBTN_DEFAULT = {"position": "fixed", "top": "80px", "left": "10px", "zIndex": 2000, "display": "none"}
+
+
+def _bar_json(value, color, label):
+    return dict(namespace="dash_bootstrap_components", type="Progress",
+                props=dict(value=value, color=color, bar=True, label=label))
+
+
+def split_bar_json(shortp, mediump, longp):
+    """layout.controls.build_split_bar as serialized by Dash."""
+    return dict(namespace="dash_bootstrap_components", type="Progress", props=dict(
+        children=[_bar_json(shortp, "success", f"Short {shortp}%"),
+                  _bar_json(mediump, "warning", f"Medium {mediump}%"),
+                  _bar_json(longp, "danger", f"Long {longp}%")],
+        striped=False, animated=False,
+    ))
+
+
+def echo_inputs(freight, shortp, mediump):
+    freight = int(round(freight or 0)); shortp = int(round(shortp or 0)); mediump = int(round(mediump or 0))
+    longp = max(0, 100 - shortp - mediump)
+    return [f"{freight}%", f"{shortp}%", f"{mediump}%", f"{longp}%", split_bar_json(shortp, mediump, longp)]
+
+
+def echo_percent(value):
+    return f"{int(round(value or 0))}%"
+
+
+def echo_name(name):
+    return name or "My Airport Scenario"
+
+
+def reset_inputs(n, defaults):
+    return [defaults["slots"], defaults["freight_share"], defaults["short_pct"], defaults["medium_pct"],
+            defaults["path"], defaults["biofuel_pct"]]
+
+
+def toggle_sidebar(trigger, n_hide, n_show, sidebar_style, showbtn_style):
+    # `trigger` stands in for dash.callback_context.triggered (None: nothing triggered)
+    sidebar_style = dict(sidebar_style or {})
+    showbtn_style = dict(showbtn_style or SHOWBTN_DEFAULT)
+    if trigger is None:
+        return [sidebar_style, showbtn_style]
+    if trigger == "btn-hide-sidebar":
+        sidebar_style["display"] = "none"; showbtn_style["display"] = "block"
+    else:
+        sidebar_style["display"] = "block"; showbtn_style["display"] = "none"
+    return [sidebar_style, showbtn_style]
+
+
+REFERENCE = dict(echo_inputs=echo_inputs, echo_percent=echo_percent, echo_name=echo_name,
+                 reset_inputs=reset_inputs, toggle_sidebar=toggle_sidebar)
+
+# Loads clientside.js with a minimal `window`, then answers every case read
+# from stdin; toggle_sidebar gets its trigger through callback_context.
+NODE_RUNNER = r"""
+const fs = require("fs");
+global.window = {dash_clientside: {}};
+eval(fs.readFileSync(process.argv[1], "utf8"));
+const mainport = window.dash_clientside.mainport;
+const cases = JSON.parse(fs.readFileSync(0, "utf8"));
+const out = cases.map(([name, args]) => {
+    if (name === "toggle_sidebar") {
+        const trigger = args[0];
+        window.dash_clientside.callback_context = {
+            triggered: trigger === null ? [] : [{prop_id: trigger + ".n_clicks", value: 1}],
+        };
+        args = args.slice(1);
+    }
+    return mainport[name](...args);
+});
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def cases(seed=0):
+    rng = random.Random(seed)
+    values = [None, 0, 1, 0.4, 0.5, 0.6, 1.5, 2.5, 3.5, 49.5, 50.5, 99.5, 100, 33, 67]
+    values += [round(rng.uniform(0, 100), rng.choice((0, 1, 2))) for _ in range(20)]
+    out = [("echo_inputs", [f, s, m]) for f, s, m in itertools.product(values[:8], values, values[::3])]
+    out += [("echo_percent", [v]) for v in values]
+    out += [("echo_name", [n]) for n in (None, "", "Schiphol 2030", "  ", "Ümlaut – scenario")]
+    out += [("reset_inputs", [n, DEFAULTS]) for n in (None, 1, 5)]
+    styles = [None, {}, {"width": "360px", "display": "block"}]
+    buttons = [None, {"position": "fixed", "display": "block"}]
+    for trigger, side, btn in itertools.product((None, "btn-hide-sidebar", "btn-show-sidebar"), styles, buttons):
+        out.append(("toggle_sidebar", [trigger, 1, 1, side, btn]))
+    return out
+
+
+def _drop_none(value):
+    if isinstance(value, dict):
+        return {k: _drop_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_drop_none(v) for v in value]
+    return value
+
+
+def check_split_bar():
+    """REFERENCE's split bar against build_split_bar, when dash is installed."""
+    try:
+        import plotly.utils
+        from layout.controls import build_split_bar
+    except ImportError:
+        print("dash not installed: split bar checked against the reference JSON only")
+        return 0
+    failures = 0
+    for shortp, mediump in itertools.product(range(0, 101, 10), repeat=2):
+        longp = max(0, 100 - shortp - mediump)
+        actual = json.loads(json.dumps(build_split_bar(shortp, mediump, longp), cls=plotly.utils.PlotlyJSONEncoder))
+        if _drop_none(actual) != _drop_none(split_bar_json(shortp, mediump, longp)):
+            print(f"build_split_bar{(shortp, mediump, longp)} differs from the reference")
+            failures += 1
+    return failures
+
+
+def main():
+    node = shutil.which("node")
+    if node is None:
+        print("node not found; install Node.js to run this check")
+        return 2
+    todo = cases()
+    run = subprocess.run([node, "-e", NODE_RUNNER, os.path.join(ROOT, "assets", "clientside.js")],
+                         input=json.dumps(todo), capture_output=True, text=True, check=True)
+    results = json.loads(run.stdout)
+    failures = 0
+    for (name, args), js in zip(todo, results):
+        expected = REFERENCE[name](*args)
+        if _drop_none(js) != _drop_none(json.loads(json.dumps(expected))):
+            failures += 1
+            if failures <= 20:
+                print(f"{name}{tuple(args)}:\n  js     {js}\n  python {expected}")
+    failures += check_split_bar()
+    print(f"{len(todo)} cases, {failures} differences")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
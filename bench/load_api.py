@@ -0,0 +1,137 @@
+"""Load test for the scenario API (services/api.py).
+
+    python bench/load_api.py                                  # in-process test client
+    python bench/load_api.py --url http://127.0.0.1:8050      # running server, e.g. gunicorn
+    python bench/load_api.py --url http://127.0.0.1:8050 --concurrency 8 --duration 20
+
+Runs three workloads for --duration seconds each: single scenarios (GET
+api/scenario, random inputs so the result cache mostly misses), JSON batches
+of --batch-size and Arrow batches of --arrow-size. Prints requests and
+scenarios per second and latency percentiles per workload.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.simplefilter("ignore")
+
+import numpy as np  # noqa: E402
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+
+def random_scenario(rng):
+    return dict(slots=rng.randint(100_000, 800_000), freight_pct=rng.randint(0, 30),
+                short_pct=rng.randint(0, 60), medium_pct=rng.randint(0, 40))
+
+
+def arrow_body(n, seed):
+    import pyarrow as pa
+    rng = np.random.default_rng(seed)
+    table = pa.table(dict(
+        slots=rng.integers(100_000, 800_000, n), freight_pct=rng.integers(0, 30, n),
+        short_pct=rng.integers(0, 60, n), medium_pct=rng.integers(0, 40, n),
+    ))
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+class HttpClient:
+    def __init__(self, url):
+        self.url = url.rstrip("/") + "/"
+
+    def request(self, method, path, body=None, content_type=None, accept=None):
+        req = urllib.request.Request(self.url + path, data=body, method=method)
+        if content_type:
+            req.add_header("Content-Type", content_type)
+        if accept:
+            req.add_header("Accept", accept)
+        with urllib.request.urlopen(req) as r:
+            assert r.status == 200, r.status
+            return len(r.read())
+
+
+class TestClient:
+    def __init__(self):
+        import app
+        self.client = app.server.test_client()
+        self.prefix = app.app.config.routes_pathname_prefix
+        self.lock = threading.Lock()  # the in-process client is not thread safe
+
+    def request(self, method, path, body=None, content_type=None, accept=None):
+        headers = {"Accept": accept} if accept else {}
+        with self.lock:
+            r = self.client.open(self.prefix + path, method=method, data=body, content_type=content_type, headers=headers)
+        assert r.status_code == 200, r.status_code
+        return len(r.data)
+
+
+def run_workload(client, make_request, scenarios_per_request, duration, concurrency):
+    latencies, lock, stop = [], threading.Lock(), time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            make_request(client, rng)
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    t = np.array(latencies)
+    return dict(
+        requests=len(t), rps=len(t) / elapsed, scenarios_per_s=len(t) * scenarios_per_request / elapsed,
+        p50_ms=float(np.percentile(t, 50)), p90_ms=float(np.percentile(t, 90)), p99_ms=float(np.percentile(t, 99)),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the scenario API.")
+    parser.add_argument("--url", help="base URL of a running server (default: in-process test client)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per workload")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--arrow-size", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    client = HttpClient(args.url) if args.url else TestClient()
+    arrow = arrow_body(args.arrow_size, 0)
+
+    def single(client, rng):
+        client.request("GET", "api/scenario?" + urllib.parse.urlencode(random_scenario(rng)))
+
+    def batch_json(client, rng):
+        body = json.dumps([random_scenario(rng) for _ in range(args.batch_size)]).encode()
+        client.request("POST", "api/scenarios", body, "application/json", "application/json")
+
+    def batch_arrow(client, rng):
+        client.request("POST", "api/scenarios", arrow, ARROW_MIMETYPE, ARROW_MIMETYPE)
+
+    workloads = dict(single=(single, 1), batch_json=(batch_json, args.batch_size), batch_arrow=(batch_arrow, args.arrow_size))
+    print(f"{'workload':<12} {'requests':>9} {'req/s':>9} {'scenarios/s':>13} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for name, (make_request, per_request) in workloads.items():
+        r = run_workload(client, make_request, per_request, args.duration, args.concurrency)
+        print(f"{name:<12} {r['requests']:>9} {r['rps']:>9.1f} {r['scenarios_per_s']:>13,.0f} "
+              f"{r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
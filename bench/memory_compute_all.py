@@ -0,0 +1,71 @@
+"""Memory benchmark for logic.model.compute_all.
+
+Run from the repository root:
+
+    python bench/memory_compute_all.py [--calls 2000]
+
+Reports the Python heap peak of a single call (tracemalloc) and the process
+RSS after every block of calls. A flat RSS column means scenario
+evaluations do not retain or copy the noise geometry. The result cache is
+switched off (configure_cache(maxsize=0)), so every call is a full
+evaluation and the RSS does not include the cache filling up.
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic.model import compute_all, configure_cache, PATHS  # noqa: E402
+
+
+def rss_mb():
+    # Current resident set size; falls back to the peak where /proc is missing
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def random_inputs(rng):
+    return (rng.randint(0, 800_000), rng.randint(0, 100), rng.randint(0, 60), rng.randint(0, 40), rng.choice(list(PATHS)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--blocks", type=int, default=10)
+    args = parser.parse_args(argv)
+    rng = random.Random(7)
+    configure_cache(maxsize=0)  # measure evaluations, not RESULT_CACHE
+
+    compute_all(*random_inputs(rng))  # warm up imports and lazy pandas state
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(20):
+        tracemalloc.reset_peak()
+        compute_all(*random_inputs(rng))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    print(f"heap peak per call: median {sorted(peaks)[len(peaks) // 2] / 1024:.1f} KiB, max {max(peaks) / 1024:.1f} KiB")
+
+    per_block = max(1, args.calls // args.blocks)
+    start = rss_mb()
+    print(f"{'calls':>8} {'rss MiB':>9} {'delta':>7}")
+    for block in range(1, args.blocks + 1):
+        for _ in range(per_block):
+            compute_all(*random_inputs(rng))
+        now = rss_mb()
+        print(f"{block * per_block:>8} {now:>9.1f} {now - start:>+7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""Benchmark suite for the model, the figure builders and the Dash callbacks.
+
+Run from the repository root:
+
+    python bench/run.py                          # run and print
+    python bench/run.py --save bench/baseline.json
+    python bench/run.py --compare bench/baseline.json [--tolerance 0.25]
+    python bench/run.py --suite startup --check-targets
+    python bench/run.py --importtime lazy        # import-time profile of app.py
+
+Every case reports latency percentiles (ms), the peak Python heap allocation
+of one call (tracemalloc) and, where applicable, the JSON payload size.
+--compare exits non-zero when a case's p50 is slower than the baseline by
+more than the tolerance (and by more than --min-delta-ms). Baselines are
+machine specific; bench/baseline.json was recorded on the reference
+development machine.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.simplefilter("ignore")
+
+import numpy as np  # noqa: E402
+
+
+def measure(fn, repeat, setup=None, payload=None):
+    """Time `fn` `repeat` times; `setup` runs untimed before every call."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    t = np.array(times)
+    result = dict(
+        n=repeat, mean_ms=float(t.mean()), p50_ms=float(np.percentile(t, 50)),
+        p90_ms=float(np.percentile(t, 90)), p99_ms=float(np.percentile(t, 99)),
+        alloc_peak_kib=peak / 1024,
+    )
+    if payload is not None:
+        result["payload_bytes"] = int(payload())
+    return result
+
+
+def random_inputs(rng):
+    return (rng.randint(100_000, 800_000), rng.randint(0, 30), rng.randint(0, 60), rng.randint(0, 40), "Hub optimized")
+
+
+def bench_model(repeat):
+    from logic import compare, model, optimize, sweep, trajectory, uncertainty
+    rng = random.Random(1)
+    defaults = (440_000, 5, 40, 30, "Hub optimized")
+    batch = [np.array(col) for col in zip(*(random_inputs(rng)[:4] for _ in range(10_000)))]
+    return {
+        "compute_all/cold": measure(lambda: model.compute_all(*random_inputs(rng)), repeat, setup=model.RESULT_CACHE.clear),
+        "compute_all/warm": measure(lambda: model.compute_all(*defaults), repeat),
+        "compute_batch/10k": measure(
+            lambda: model.compute_batch(*batch),
+            max(3, repeat // 10),
+        ),
+        "kpi_bands/20k": measure(
+            lambda: uncertainty.kpi_bands(*random_inputs(rng)[:4]),
+            repeat, setup=uncertainty._cached_bands.cache_clear,
+        ),
+        "optimize/solve": measure(
+            lambda: optimize.solve({"people_worse": (None, 500_000), "jobs_direct": (350_000, None)}),
+            max(3, repeat // 10),
+        ),
+        "optimize/pareto": measure(lambda: optimize.pareto(), max(3, repeat // 10)),
+        "compare/5 pinned": measure(
+            lambda: compare.differences(compare.summary(model.compute_all(*random_inputs(rng))),
+                                        compare.pinned([random_inputs(random.Random(i)) for i in range(5)])),
+            repeat, setup=model.RESULT_CACHE.clear,
+        ),
+        "trajectory/10x26y": measure(
+            lambda: trajectory.trajectory(*random_inputs(rng)[:4], slot_growth=np.linspace(0, 3, 10), target_short_pct=30),
+            repeat,
+        ),
+        "sweep/100k": measure(
+            lambda: sweep.sweep(dict(slots=range(100_000, 800_001, 28_000), freight_pct=range(0, 31),
+                                     short_pct=range(0, 61, 5), medium_pct=range(0, 41, 4))),
+            max(3, repeat // 10),
+        ),
+    }
+
+
+def bench_figures(repeat):
+    import pandas as pd
+    from dash._utils import to_json
+    import charts.noise as noise_charts
+    from charts.value import value_fig, pax_hist_fig, cargo_hist_fig
+    from charts.employment import employment_fig
+    from logic import model
+    from logic.noise_data import data_version, noise_gdf
+
+    out = model.compute_all(440_000, 5, 40, 30, "Hub optimized")
+    seg, gdf, version = out["seg"], noise_gdf(), data_version()
+    hist_df = pd.DataFrame(dict(Lden_sim=out["lden_sim"]))
+
+    def clear_map_caches():
+        noise_charts._LAYER_CACHE.clear()
+        noise_charts._FIG_CACHE.clear()
+
+    def size(build):
+        return lambda: len(to_json(build()))
+
+    choropleth = lambda: noise_charts.noise_choropleth_fig(gdf, "Lden_sim", version)  # noqa: E731
+    cases = {
+        "noise_choropleth_fig/cold": measure(choropleth, max(3, repeat // 10), setup=clear_map_caches, payload=size(choropleth)),
+        "noise_choropleth_fig/warm": measure(choropleth, repeat),
+        "noise_hist_fig": measure(lambda: noise_charts.noise_hist_fig(hist_df), repeat, payload=size(lambda: noise_charts.noise_hist_fig(hist_df))),
+    }
+    for fn in (value_fig, pax_hist_fig, cargo_hist_fig, employment_fig):
+        cases[fn.__name__] = measure(lambda fn=fn: fn(seg), repeat, payload=size(lambda fn=fn: fn(seg)))
+    return cases
+
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def _callback_requests(client):
+    """One /_dash-update-component body builder per server-side callback."""
+    deps = client.get("/_dash-dependencies").json
+    builders = {}
+    for dep in deps:
+        if dep.get("clientside_function"):
+            continue
+        outputs = []
+        for spec in dep["output"].strip(".").split("..."):
+            cid, prop = spec.rsplit(".", 1)
+            outputs.append(dict(id=cid, property=prop))
+
+        def body(values, dep=dep, outputs=outputs):
+            return dict(
+                output=dep["output"], outputs=outputs if len(outputs) > 1 else outputs[0],
+                inputs=[dict(i, value=values.get(i["id"])) for i in dep["inputs"]],
+                state=[dict(s, value=values.get(s["id"])) for s in dep.get("state", [])],
+                changedPropIds=[f"{dep['inputs'][0]['id']}.{dep['inputs'][0]['property']}"],
+            )
+        builders[dep["output"]] = body
+    return builders
+
+
+def bench_callbacks(repeat):
+    import app
+    from logic import model
+
+    client = app.server.test_client()
+    client.get("/")
+    model_outputs = ("kpi_homes", "pax_stack", "noise_map")
+    builders = {k: v for k, v in _callback_requests(client).items()
+                if any(o in k for o in model_outputs) and any(i["id"] == "slots" for i in v({})["inputs"])}
+    rng = random.Random(2)
+    sizes = {}
+
+    def interaction(headers=None):
+        # One slider move: every model callback fires with the same inputs
+        slots, freight, shortp, mediump, path = random_inputs(rng)
+        values = dict(slots=slots, freight_pct=freight, short_pct=shortp, medium_pct=mediump, path=path)
+        total = 0
+        for build in builders.values():
+            r = client.post("/_dash-update-component", json=build(values), headers=headers)
+            assert r.status_code == 200, r.status_code
+            total += len(r.data)
+        sizes["last"] = total
+
+    cases = {
+        "interaction/cold": measure(interaction, repeat, setup=model.RESULT_CACHE.clear, payload=lambda: sizes["last"]),
+        "interaction/gzip": measure(lambda: interaction(GZIP), repeat, setup=model.RESULT_CACHE.clear,
+                                   payload=lambda: sizes["last"]),
+        "layout": measure(lambda: client.get("/_dash-layout"), max(3, repeat // 10),
+                          payload=lambda: len(client.get("/_dash-layout").data)),
+        "layout/gzip": measure(lambda: client.get("/_dash-layout", headers=GZIP), max(3, repeat // 10),
+                               payload=lambda: len(client.get("/_dash-layout", headers=GZIP).data)),
+        "noise_geojson/gzip": measure(lambda: client.get(app.NOISE_GEOJSON_URL, headers=GZIP), max(3, repeat // 10),
+                                      payload=lambda: len(client.get(app.NOISE_GEOJSON_URL, headers=GZIP).data)),
+    }
+    return cases
+
+
+def bench_serialization(repeat):
+    """Encoding of the two heavy payloads: the layout and a noise update.
+    Compares the stdlib and orjson engines, decimal lists and typed arrays,
+    and reports the gzipped size next to the raw size."""
+    import gzip
+    import plotly.io.json as pj
+    from dash import Patch
+    from dash._utils import to_json
+    import app
+    from services.serialization import orjson, typed_array
+
+    levels = app.initial_scenario()["lden_sim"]
+
+    def noise_patch(encode):
+        fig = Patch()
+        fig["data"][0]["z"] = encode(levels)
+        return dict(multi=True, response=dict(noise_map=dict(figure=fig)))
+
+    payloads = {
+        "layout": app.app._layout_value,
+        "noise_update/list": lambda: noise_patch(lambda a: a.tolist()),
+        "noise_update/typed": lambda: noise_patch(typed_array),
+    }
+    engines = ["json"] + (["orjson"] if orjson is not None else [])
+    previous = pj.config.default_engine
+    cases = {}
+    try:
+        for engine in engines:
+            pj.config.default_engine = engine
+            for name, build in payloads.items():
+                cases[f"encode/{name}/{engine}"] = measure(lambda build=build: to_json(build()), repeat,
+                                                    payload=lambda build=build: len(to_json(build()).encode()))
+        for name, build in payloads.items():
+            body = to_json(build()).encode()
+            cases[f"encode/{name}/gzip"] = measure(lambda body=body: gzip.compress(body, 6), repeat,
+                                            payload=lambda body=body: len(gzip.compress(body, 6)))
+    finally:
+        pj.config.default_engine = previous
+    return cases
+
+
+# Time to first response: a fresh process imports the app and serves the
+# page, its layout and one model update. Targets (ms, reference machine) are
+# checked with --check-targets.
+FIRST_RESPONSE = """
+import warnings; warnings.simplefilter('ignore')
+import app
+client = app.server.test_client()
+for path in ('/', '/_dash-layout'):
+    assert client.get(path).status_code == 200
+app.scenario(440000, 5, 40, 30, 'Hub optimized', 0)
+"""
+# p90 in bench/baseline.json plus ~20% headroom. Lazy mode moves the chart
+# modules and data from import to the first page load, so its first response
+# costs about as much as the eager one; the gain is in the import itself.
+STARTUP_TARGETS_MS = {
+    "import app/lazy": 2600,
+    "first response/lazy": 4200,
+    "first response": 4600,
+}
+
+
+def _run_startup(code, mode):
+    env = dict(os.environ, MAINPORT_STARTUP=mode)
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def bench_startup(repeat):
+    import_app = "import warnings; warnings.simplefilter('ignore'); import app"
+    cases = {}
+    for mode, suffix in (("eager", ""), ("lazy", "/lazy")):
+        cases[f"import app{suffix}"] = measure(lambda mode=mode: _run_startup(import_app, mode), repeat)
+        cases[f"first response{suffix}"] = measure(lambda mode=mode: _run_startup(FIRST_RESPONSE, mode), repeat)
+    return cases
+
+
+def import_profile(mode="lazy", top=25):
+    """Modules with the largest cumulative import time for `import app`
+    (from python -X importtime), as (cumulative ms, self ms, module)."""
+    env = dict(os.environ, MAINPORT_STARTUP=mode)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                          cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+SUITES = dict(model=bench_model, figures=bench_figures, callbacks=bench_callbacks,
+              serialization=bench_serialization, startup=bench_startup)
+
+
+def print_results(results, baseline=None):
+    print(f"{'case':<32} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'alloc KiB':>10} {'bytes':>10} {'vs base':>8}")
+    for name, r in results.items():
+        ratio = ""
+        if baseline and name in baseline:
+            ratio = f"{r['p50_ms'] / max(baseline[name]['p50_ms'], 1e-9):.2f}x"
+        print(f"{name:<32} {r['p50_ms']:>9.3f} {r['p90_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['alloc_peak_kib']:>10.1f} {r.get('payload_bytes', ''):>10} {ratio:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's hot paths.")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="run only these suites")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--save", help="write results (and environment) to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    parser.add_argument("--check-targets", action="store_true", help="fail when a startup case misses its target")
+    parser.add_argument("--importtime", choices=("eager", "lazy"), help="print the import-time profile of app.py and exit")
+    args = parser.parse_args(argv)
+
+    if args.importtime:
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for cumulative, own, name in import_profile(args.importtime):
+            print(f"{cumulative:>14.1f} {own:>9.1f}  {name}")
+        return 0
+
+    results = {}
+    for name in args.suite or SUITES:
+        repeat = args.repeat if name != "startup" else max(3, args.repeat // 10)
+        results.update(SUITES[name](repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(dict(python=sys.version.split()[0], machine=platform.machine(), results=results), f, indent=1)
+
+    if args.check_targets:
+        missed = [n for n, target in STARTUP_TARGETS_MS.items() if n in results and results[n]["p50_ms"] > target]
+        for n in missed:
+            print(f"target missed: {n} p50 {results[n]['p50_ms']:.0f} ms > {STARTUP_TARGETS_MS[n]} ms")
+        if missed:
+            return 1
+
+    if baseline:
+        slower = [
+            n for n, r in results.items() if n in baseline
+            and r["p50_ms"] > baseline[n]["p50_ms"] * (1 + args.tolerance)
+            and r["p50_ms"] - baseline[n]["p50_ms"] > args.min_delta_ms
+        ]
+        if slower:
+            print("regressions:", ", ".join(slower))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
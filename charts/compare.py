@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from charts.noise import noise_choropleth_fig
+from logic.model import SEGMENT_LABELS
+from services.metrics import timed
+
+QUANTITY_LABELS = dict(Pax="Passengers (million)", Cargo="Cargo (million tons)", AddedValue="Added value (€m)",
+                       Jobs="Employment (jobs)", CO2="CO₂ emissions (Mt)", Slots="Slots")
+
+
+@timed("chart.compare_segments_fig")
+def compare_segments_fig(active, pinned, names, quantity="AddedValue", active_name="Active"):
+    """Grouped bars per segment: the active scenario next to the pinned ones.
+    `active` is (segments,), `pinned` (P, segments), both in SEGMENTS order."""
+    fig = go.Figure([go.Bar(x=SEGMENT_LABELS, y=active, name=active_name, marker_color="#333333")] + [
+        go.Bar(x=SEGMENT_LABELS, y=values, name=name) for name, values in zip(names, pinned)
+    ])
+    fig.update_layout(barmode="group", title=QUANTITY_LABELS.get(quantity, quantity),
+                      margin=dict(l=10, r=10, t=40, b=10), legend=dict(orientation="h"))
+    return fig
+
+
+@timed("chart.compare_map_fig")
+def compare_map_fig(gdf: pd.DataFrame, version=None, geojson_url=None):
+    """Map of the per-polygon Lden difference (active minus a pinned
+    scenario), at zero; callbacks patch in the differences and color range."""
+    if gdf is None or len(gdf) == 0:
+        return px.choropleth_mapbox()
+    fig = noise_choropleth_fig(gdf, color_col="Lden_diff", version=version, values=np.zeros(len(gdf)),
+                               geojson_url=geojson_url)
+    fig.update_layout(coloraxis=dict(colorscale="RdBu_r", cmin=-1, cmax=1, colorbar_title="Δ Lden (dB)"),
+                      title="Lden difference with the reference")
+    return fig
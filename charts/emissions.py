@@ -0,0 +1,26 @@
+import pandas as pd
+import plotly.express as px
+
+from services.metrics import timed
+
+
+@timed("chart.emissions_overview_fig")
+def emissions_overview_fig(seg: pd.DataFrame):
+    if seg is None or seg.empty or "CO2" not in seg:
+        return px.bar()
+    fig = px.bar(seg, x="Segment", y="CO2", title=f"CO₂ emissions by segment (Mt/yr, total {seg['CO2'].sum():,.2f})")
+    fig.update_layout(margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+@timed("chart.emissions_stack_fig")
+def emissions_stack_fig(seg: pd.DataFrame):
+    """CO₂ per haul, stacked by passenger and freight flights."""
+    if seg is None or seg.empty or "CO2" not in seg:
+        return px.bar()
+    parts = seg["Segment"].str.split(" - ", expand=True)
+    df = pd.DataFrame(dict(Type=parts[0], Haul=parts[1], CO2=seg["CO2"].to_numpy()))
+    fig = px.bar(df, x="Haul", y="CO2", color="Type", category_orders=dict(Haul=["Short", "Medium", "Long"]),
+                 title="CO₂ emissions by haul (Mt/yr)")
+    fig.update_layout(barmode="stack", margin=dict(l=10, r=10, t=40, b=10))
+    return fig
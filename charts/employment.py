@@ -1,6 +1,9 @@
 import pandas as pd
 import plotly.express as px
 
+from services.metrics import timed
+
+@timed("chart.employment_fig")
 def employment_fig(seg: pd.DataFrame):
     if seg is None or seg.empty or "Jobs" not in seg:
         return px.bar()
@@ -1,12 +1,25 @@
 import json
+import os
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from dash import html
 
+from services.metrics import span, timed
+
 try:
     import geopandas as gpd
+    import shapely
 except Exception:
     gpd = None
+    shapely = None
+
+# Level of detail: simplification tolerance (degrees) for the map zoom picked by
+# _bounds_center_zoom. Closer zooms keep more vertices; beyond the last tier
+# the finest tolerance is used.
+LOD_TOLERANCE = {8: 0.002, 9: 0.001, 10: 0.0005, 11: 0.0002}
+COORD_DECIMALS = 5  # ~1 m at these latitudes
+LOD_CACHE_DIR = os.path.join("data", ".cache")
 
 
 def _bounds_center_zoom(gdf):
@@ -28,14 +41,58 @@ def _bounds_center_zoom(gdf):
     return dict(lat=cy, lon=cx), z
 
 
-def noise_choropleth_fig(gdf: pd.DataFrame, color_col: str = "Lden_sim"):
-    """Create a choropleth from a GeoDataFrame with polygon geometry.
-    Expects columns: geometry; and a numeric column to color by (default 'Lden_sim').
-    If gdf is None or empty, return an empty placeholder figure.
-    """
-    if gdf is None or len(gdf) == 0:
-        return px.choropleth_mapbox(pd.DataFrame(dict(dummy=[])), geojson={}, locations="dummy", mapbox_style="open-street-map", zoom=9, center=dict(lat=52.308, lon=4.764), opacity=0.6)
+# Reprojected layers and finished figures, keyed by data version. The noise
+# polygons do not change between scenario updates, so the expensive
+# to_crs / to_json work only has to happen once per dataset.
+_LAYER_CACHE = {}
+_FIG_CACHE = {}
+
+
+def _empty_map(**kwargs):
+    return px.choropleth_mapbox(pd.DataFrame(dict(dummy=[])), geojson={}, locations="dummy", mapbox_style="open-street-map", zoom=9, center=dict(lat=52.308, lon=4.764), opacity=0.6, **kwargs)
+
+
+def _simplify(geoms, tolerance):
+    # Coverage simplification keeps shared borders shared (no gaps or slivers
+    # between neighbours); older GEOS only offers per-polygon simplification.
+    if tolerance:
+        if hasattr(shapely, "coverage_simplify"):
+            geoms = shapely.coverage_simplify(geoms, tolerance)
+        else:
+            geoms = shapely.simplify(geoms, tolerance, preserve_topology=True)
+    return shapely.transform(geoms, lambda xy: np.round(xy, COORD_DECIMALS))
+
+
+def _tier_text(gdf, tolerance, version):
+    """GeoJSON text of the (simplified, quantized) geometry with feature ids
+    "0".."n-1". Tiers are cached on disk per data version and kept as text, so
+    serving them (see noise_geojson_text) never decodes and re-encodes them."""
+    path = None
+    if version is not None:
+        path = os.path.join(LOD_CACHE_DIR, f"noise-{version}-{tolerance or 'full'}.geojson")
+        try:
+            with open(path) as f:
+                return f.read()
+        except OSError:
+            pass
 
+    if shapely is not None:
+        geoms = gpd.GeoSeries(_simplify(gdf.geometry.values, tolerance), index=gdf.index)
+        text = geoms.to_json()  # geometry and id only; values travel in the figure data
+    else:
+        text = gdf.to_json()
+    if path is not None:
+        try:
+            os.makedirs(LOD_CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "w") as f:
+                f.write(text)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+    return text
+
+
+def _build_layer(gdf, version=None, lod=True):
     # Ensure we have a GeoDataFrame
     if gpd is not None and not isinstance(gdf, gpd.GeoDataFrame):
         try:
@@ -46,22 +103,78 @@ def noise_choropleth_fig(gdf: pd.DataFrame, color_col: str = "Lden_sim"):
     # Project to WGS84 for mapbox
     if hasattr(gdf, "to_crs"):
         try:
-            gdf = gdf.to_crs(4326)
+            with span("noise.reproject"):
+                gdf = gdf.to_crs(4326)
         except Exception:
             pass
 
-    if color_col not in gdf.columns:
-        # fall back to 'Lden' if available
-        color_col = "diff" if "diff" in gdf.columns else None
-    if color_col is None:
-        return px.choropleth_mapbox(pd.DataFrame(dict(dummy=[])), geojson={}, locations="dummy", mapbox_style="open-street-map", zoom=9, center=dict(lat=52.308, lon=4.764), opacity=0.6, color_continuous_scale=["red", "orange", "yellow", "green"])
-
     # Plotly needs a feature id; we'll use the index
     gdf = gdf.reset_index(drop=True)
     gdf["fid"] = gdf.index.astype(str)
-    geojson = json.loads(gdf.to_json())
 
     center, zoom = _bounds_center_zoom(gdf)
+    tolerance = LOD_TOLERANCE.get(zoom, min(LOD_TOLERANCE.values())) if lod else None
+    with span("noise.geojson"):
+        text = _tier_text(gdf, tolerance, version)
+    return gdf, text, center, zoom
+
+
+def _layer(gdf, version=None, lod=True):
+    if version is None:
+        return _build_layer(gdf, lod=lod)
+    if (version, lod) not in _LAYER_CACHE:
+        _LAYER_CACHE[(version, lod)] = _build_layer(gdf, version, lod)
+    return _LAYER_CACHE[(version, lod)]
+
+
+def noise_layer(gdf, version=None, lod=True):
+    """Return (gdf_wgs84, geojson, center, zoom) for the noise polygons.
+    With `lod` the geometry is simplified to the tier for the computed zoom;
+    lod=False keeps full resolution. With a `version` the layer is memoized
+    (and the tier cached on disk); pass a new version when the data changes.
+    """
+    gdf, text, center, zoom = _layer(gdf, version, lod)
+    return gdf, json.loads(text), center, zoom
+
+
+def noise_geojson_text(gdf, version=None, lod=True):
+    """The layer's GeoJSON as text, ready to be served as is."""
+    return _layer(gdf, version, lod)[1]
+
+
+@timed("chart.noise_choropleth_fig")
+def noise_choropleth_fig(gdf: pd.DataFrame, color_col: str = "Lden_sim", version=None, values=None, lod=True, geojson_url=None):
+    """Create a choropleth from a GeoDataFrame with polygon geometry.
+    Expects columns: geometry; and a numeric column to color by (default 'Lden_sim').
+    `values` (one per row, e.g. model.lden_sim()) supplies color_col without
+    touching the frame. If gdf is None or empty, return an empty placeholder figure.
+    `lod` selects simplified geometry for the computed zoom (see noise_layer).
+    When `version` is given and no `values` are passed, the figure is cached per
+    (color_col, version, lod, geojson_url); treat the returned figure as read-only.
+    With `geojson_url` (serving noise_geojson_text) the figure references the
+    geometry instead of embedding it, so the browser fetches and caches it once.
+    """
+    if gdf is None or len(gdf) == 0:
+        return _empty_map()
+
+    key = (color_col, version, lod, geojson_url)
+    cacheable = version is not None and values is None
+    if cacheable and key in _FIG_CACHE:
+        return _FIG_CACHE[key]
+
+    if geojson_url is None:
+        gdf, geojson, center, zoom = noise_layer(gdf, version, lod)
+    else:
+        gdf, _, center, zoom = _layer(gdf, version, lod)
+        geojson = geojson_url
+    if values is not None:
+        gdf = gdf.assign(**{color_col: values})
+
+    if color_col not in gdf.columns:
+        # fall back to 'Lden' if available
+        color_col = "diff" if "diff" in gdf.columns else None
+    if color_col is None:
+        return _empty_map(color_continuous_scale=["red", "orange", "yellow", "green"])
 
     fig = px.choropleth_mapbox(
         gdf,
@@ -75,17 +188,77 @@ def noise_choropleth_fig(gdf: pd.DataFrame, color_col: str = "Lden_sim"):
         hover_data=['aantalInwoners'],
     )
     fig.update_layout(margin=dict(l=10, r=10, t=40, b=10))
+    if cacheable:
+        _FIG_CACHE[key] = fig
     return fig
 
 
-def noise_hist_fig(ndf: pd.DataFrame):
-    if ndf is None or len(ndf) == 0 or ("diff" not in ndf.columns and "Lden" not in ndf.columns):
-        return px.histogram(pd.DataFrame(dict(Lden=[])), x="Lden", nbins=40, title="Distribution of Lden")
-    col = "diff" if "diff" in ndf.columns else "Lden"
-    fig = px.histogram(ndf, x=col, nbins=40, title="Distribution of Lden")
+# Histogram grid: HIST_BINS bins of a fixed width, aligned to a fixed origin,
+# chosen once per data version. Scenarios shift the noise levels, so each
+# update picks the window of HIST_BINS bins holding the values and only the
+# counts are recomputed; the figure payload does not grow with the data.
+HIST_BINS = 40
+_HIST_GRID_CACHE = {}
+
+
+def _nice_step(step):
+    exp = 10.0 ** np.floor(np.log10(step))
+    for m in (1, 2, 2.5, 5, 10):
+        if step <= m * exp:
+            return m * exp
+    return 10 * exp
+
+
+def hist_grid(values, version=None, nbins=HIST_BINS):
+    """(origin, width) of the bin grid; cached per `version` when given."""
+    key = (version, nbins)
+    if version is not None and key in _HIST_GRID_CACHE:
+        return _HIST_GRID_CACHE[key]
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    lo, hi = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+    # nbins - 1 steps: any shifted copy of the values still fits in nbins bins
+    width = _nice_step(max(hi - lo, 1e-9) / (nbins - 1))
+    grid = (float(np.floor(lo / width) * width), float(width))
+    if version is not None:
+        _HIST_GRID_CACHE[key] = grid
+    return grid
+
+
+def hist_counts(values, version=None, weights=None, nbins=HIST_BINS):
+    """Bin centers, counts (or summed `weights`) and bin width of `values`."""
+    origin, width = hist_grid(values, version, nbins)
+    values = np.asarray(values, dtype=float)
+    ok = np.isfinite(values)
+    values = values[ok]
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)[ok]
+    start = origin + (np.floor((values.min() - origin) / width) * width if len(values) else 0.0)
+    idx = np.clip(np.floor((values - start) / width).astype(np.intp), 0, nbins - 1)
+    counts = np.bincount(idx, weights=weights, minlength=nbins)
+    centers = start + (np.arange(nbins) + 0.5) * width
+    return centers, counts, width
+
+
+@timed("chart.noise_hist_fig")
+def noise_hist_fig(ndf: pd.DataFrame, version=None, weight_col=None):
+    """Histogram of the noise levels, binned here rather than in the browser.
+    `weight_col` (e.g. 'aantalInwoners') weights every polygon, giving people
+    instead of areas per bin. With a `version` the bin grid is fixed for the
+    data version, so updates can patch x and y (see hist_counts)."""
+    cols = [c for c in ("Lden_sim", "diff", "Lden") if ndf is not None and c in ndf.columns]
+    if ndf is None or len(ndf) == 0 or not cols:
+        return px.histogram(pd.DataFrame(dict(Lden=[])), x="Lden", nbins=HIST_BINS, title="Distribution of Lden")
+    col = cols[0]
+    weights = ndf[weight_col].to_numpy() if weight_col is not None else None
+    centers, counts, width = hist_counts(ndf[col].to_numpy(), version, weights)
+    label = "people" if weight_col is not None else "count"
+    fig = px.bar(x=centers, y=counts, labels=dict(x=col, y=label), title="Distribution of Lden")
+    fig.update_traces(width=width, hovertemplate=f"{col}=%{{x}}<br>{label}=%{{y}}<extra></extra>")
     fig.update_layout(
         margin=dict(l=0, r=0, t=20, b=50),
         height=300,
+        bargap=0,
         title_font=dict(
             size=12,
             family="Arial",
@@ -0,0 +1,27 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from charts.sensitivity import METRIC_LABELS
+from services.metrics import timed
+
+
+@timed("chart.pareto_fig")
+def pareto_fig(df: pd.DataFrame, x: str = "va_direct", y: str = "people_worse", best: pd.DataFrame = None):
+    """Pareto frontier from logic.optimize.pareto, with the solver's best
+    scenarios (logic.optimize.solve) marked when given."""
+    if df is None or df.empty:
+        return px.scatter()
+    hover = [f"{s:,} slots, freight {f}%, short {sh}%, medium {m}%"
+             for s, f, sh, m in zip(df["slots"], df["freight_pct"], df["short_pct"], df["medium_pct"])]
+    fig = go.Figure(go.Scatter(x=df[x], y=df[y], mode="lines+markers", name="Pareto frontier",
+                               line_shape="hv", text=hover, hoverinfo="x+y+text"))
+    if best is not None and not best.empty:
+        fig.add_trace(go.Scatter(x=best[x], y=best[y], mode="markers", name="Best for targets",
+                                 marker=dict(size=12, symbol="star", color="#d62728")))
+    fig.update_layout(
+        title=f"{METRIC_LABELS.get(x, x)} vs {METRIC_LABELS.get(y, y)}",
+        xaxis_title=METRIC_LABELS.get(x, x), yaxis_title=METRIC_LABELS.get(y, y),
+        margin=dict(l=10, r=10, t=40, b=10),
+    )
+    return fig
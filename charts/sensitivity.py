@@ -0,0 +1,53 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from services.metrics import timed
+
+PARAM_LABELS = dict(slots="Slots", freight_pct="Freight share (%)", short_pct="Short-haul (%)", medium_pct="Medium-haul (%)")
+METRIC_LABELS = dict(
+    va_direct="Added value – direct (€m)", va_indirect="Added value – indirect (€m)",
+    jobs_direct="Employment – direct (jobs)", jobs_indirect="Employment – indirect (jobs)",
+    homes="# people improved", people_worse="# people worse off", noise_delta="Lden change (dB)",
+    total_pax="Total passengers (millions)", total_cargo_freight="Freight cargo (million tons)",
+    total_cargo_belly="Belly cargo (million tons)", co2="CO₂ emissions (Mt)",
+)
+
+
+@timed("chart.tornado_fig")
+def tornado_fig(df: pd.DataFrame, metric: str = "va_direct"):
+    """Tornado chart from logic.sweep.tornado: bars from the base value to the
+    value at the low and the high end of each parameter."""
+    if df is None or df.empty:
+        return px.bar()
+    df = df.iloc[::-1]  # largest swing on top
+    labels = [f"{PARAM_LABELS.get(p, p)} ({lo:,} – {hi:,})" for p, lo, hi in zip(df["parameter"], df["low"], df["high"])]
+    base = float(df["base_value"].iloc[0])
+    fig = go.Figure([
+        go.Bar(y=labels, x=df["low_value"] - base, base=base, orientation="h", name="Low", marker_color="#1f77b4"),
+        go.Bar(y=labels, x=df["high_value"] - base, base=base, orientation="h", name="High", marker_color="#d62728"),
+    ])
+    fig.update_layout(
+        barmode="overlay",
+        title=f"Sensitivity of {METRIC_LABELS.get(metric, metric)}",
+        xaxis_title=METRIC_LABELS.get(metric, metric),
+        margin=dict(l=10, r=10, t=40, b=10),
+    )
+    fig.add_vline(x=base, line_dash="dot", line_color="gray")
+    return fig
+
+
+@timed("chart.heatmap_fig")
+def heatmap_fig(grid: pd.DataFrame, metric: str = "jobs_direct"):
+    """Heatmap of logic.sweep.heatmap output (rows: y parameter, columns: x parameter)."""
+    if grid is None or grid.empty:
+        return go.Figure()
+    fig = px.imshow(
+        grid, origin="lower", aspect="auto", color_continuous_scale="Viridis",
+        labels=dict(x=PARAM_LABELS.get(grid.columns.name, grid.columns.name),
+                    y=PARAM_LABELS.get(grid.index.name, grid.index.name),
+                    color=METRIC_LABELS.get(metric, metric)),
+        title=METRIC_LABELS.get(metric, metric),
+    )
+    fig.update_layout(margin=dict(l=10, r=10, t=40, b=10))
+    return fig
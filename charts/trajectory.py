@@ -0,0 +1,30 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from charts.sensitivity import METRIC_LABELS
+from logic.model import SEGMENT_LABELS
+from services.metrics import timed
+
+
+@timed("chart.trajectory_fig")
+def trajectory_fig(df: pd.DataFrame, metric: str = "va_direct"):
+    """One line per scenario over the years, from logic.trajectory.to_frame."""
+    if df is None or df.empty:
+        return px.line()
+    fig = px.line(df, x="year", y=metric, color="scenario", markers=False,
+                  labels=dict(year="Year", scenario="Scenario", **{metric: METRIC_LABELS.get(metric, metric)}))
+    fig.update_layout(title=METRIC_LABELS.get(metric, metric), margin=dict(l=10, r=10, t=40, b=10), hovermode="x unified")
+    return fig
+
+
+@timed("chart.fleet_mix_fig")
+def fleet_mix_fig(years, seg_slots, title="Slots per segment"):
+    """Stacked area of the slots per segment (years x segments, SEGMENTS order)."""
+    fig = go.Figure([
+        go.Scatter(x=list(years), y=seg_slots[:, j], name=label, mode="lines", stackgroup="slots")
+        for j, label in enumerate(SEGMENT_LABELS)
+    ])
+    fig.update_layout(title=title, xaxis_title="Year", yaxis_title="Slots",
+                      margin=dict(l=10, r=10, t=40, b=10), hovermode="x unified")
+    return fig
@@ -2,11 +2,15 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from services.metrics import timed
+
+@timed("chart.value_fig")
 def value_fig(seg: pd.DataFrame):
     if seg is None or seg.empty or "AddedValue" not in seg:
         return px.bar()
     return px.bar(seg, x="Segment", y="AddedValue", title="Added value by segment (€m/yr)")
 
+@timed("chart.pax_hist_fig")
 def pax_hist_fig(seg: pd.DataFrame):
     if seg is None or len(seg) == 0:
         return px.bar()
@@ -27,6 +31,7 @@ def pax_hist_fig(seg: pd.DataFrame):
     )
     return fig 
 
+@timed("chart.cargo_hist_fig")
 def cargo_hist_fig(seg: pd.DataFrame):
     if seg is None or len(seg) == 0:
         return px.bar()
@@ -7,6 +7,12 @@ def kpi_card(title, id_):
         html.Div(id=id_, className="h4 mb-0"),
     ]), className="shadow-sm")
 
+def kpi_value(value, low=None, high=None):
+    """KPI card contents: the value, with its P5–P95 band underneath when given."""
+    if low is None:
+        return value
+    return [html.Span(value), html.Div(f"P5–P95: {low} – {high}", className="small text-muted fw-normal")]
+
 def build_kpi_rows():
     row1 = dbc.Row([
         dbc.Col(kpi_card("# people improved (Lden lowered > 1dB)", "kpi_homes"), md=3, xs=6),
@@ -0,0 +1,18 @@
+# gunicorn -c gunicorn.conf.py app:server
+import gc
+import os
+
+bind = "0.0.0.0:8050"
+workers = 2
+
+# Import app.py (and with it the noise data, Excel inputs and figures) once
+# in the master; forked workers share those pages copy-on-write. In the lazy
+# and background startup modes (MAINPORT_STARTUP, see app.py) every worker
+# imports the app itself and boots without waiting for the data.
+preload_app = os.environ.get("MAINPORT_STARTUP", "eager") == "eager"
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach so that GC
+    # passes in the workers do not touch (and thereby copy) the shared pages.
+    gc.freeze()
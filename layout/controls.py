@@ -1,6 +1,5 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-import dash_table
 
 def slider_with_val(id_, label, min_, max_, value, step=1):
     return html.Div([
@@ -43,12 +42,14 @@ def build_sidebar(paths: dict, defaults: dict):
             dbc.Col(html.Label("Long-haul (%)", className="fw-semibold small"), width=6),
             dbc.Col(html.Div(id="long_pct_val", className="text-end small fw-semibold"), width=6),
         ], className="mb-1"),
-        html.Div(id="long_pct_bar"),
+        html.Div(build_split_bar(defaults["short_pct"], defaults["medium_pct"], max(0, 100 - defaults["short_pct"] - defaults["medium_pct"])), id="long_pct_bar"),
         html.Hr(),
         dbc.Row([
             dbc.Col(html.Label("Path", className="fw-semibold small"), width=4),
             dbc.Col(dcc.Dropdown(id="path", options=[{"label":k, "value":k} for k in paths], value=defaults["path"], clearable=False), width=8),
         ], className="mb-3"),
+        slider_with_val("biofuel_pct", "Biofuel share (%)", 0, 100, defaults["biofuel_pct"], step=5),
+        dbc.Switch(id="uncertainty", label="Uncertainty bands (P5–P95)", value=False, className="small"),
         html.Hr(),
         
         dbc.Button("Reset", id="btn-reset", color="light", className="w-100 mb-2"),
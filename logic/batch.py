@@ -0,0 +1,172 @@
+"""Evaluate scenario libraries through the batch model, without Dash.
+
+    python -m logic.batch                                   # data/scenarios.xlsx
+    python -m logic.batch library.parquet -o kpis.parquet --workers 0
+    python -m logic.batch library.csv -o kpis.csv --chunk-size 100000
+
+Input is an Excel, CSV or Parquet table with one scenario per row. Columns
+named like the sidebar inputs (sweep.PARAMS, and optionally `path` and
+`biofuel_pct`) are used
+as they are; missing ones are taken from DEFAULTS. Rows in the layout of
+data/scenarios.xlsx ("<haul> haul increase" / "<haul> haul decrease" per
+path) are turned into inputs by `haul_change_inputs` first.
+
+CSV and Parquet inputs are read in chunks, every chunk goes through
+`model.compute_batch` in one call, and the KPIs (sweep.METRICS) are appended
+to the output file chunk by chunk, so memory stays flat however large the
+library. `workers` > 1 spreads the chunks over a ProcessPoolExecutor; output
+keeps the input order.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from logic import model
+from logic.input_cache import read_excel_cached
+from logic.sweep import METRICS, PARAMS, base_scenario
+
+CHUNK_SIZE = 50_000
+# Columns of a scenario, in compute_batch argument order
+INPUTS = PARAMS + ("path", "biofuel_pct")
+HAULS = ("short", "medium", "long")
+
+
+def haul_change_inputs(df: pd.DataFrame, unit=1.0, base=None) -> pd.DataFrame:
+    """Model inputs for rows in the data/scenarios.xlsx layout.
+
+    The increase and decrease columns of a haul add up to its net change in
+    slots (times `unit`, for libraries in other units such as weekly
+    flights). The change is applied to the haul's slots in `base` (DEFAULTS
+    otherwise); slots and haul shares follow from the new totals, the
+    freight share is kept. The row label (or a `scenario` column) is the path.
+    """
+    base = base_scenario(base)
+    haul_slots = base["slots"] * np.array([base["short_pct"], base["medium_pct"],
+                                           max(0, 100 - base["short_pct"] - base["medium_pct"])]) / 100
+    change = np.stack([
+        df[f"{h} haul increase"].to_numpy(dtype=float) + df[f"{h} haul decrease"].to_numpy(dtype=float)
+        for h in HAULS
+    ], axis=1) * unit
+    new = np.maximum(0.0, haul_slots[None, :] + change)
+    slots = new.sum(axis=1)
+    share = np.divide(100 * new, slots[:, None], out=np.zeros_like(new), where=slots[:, None] > 0)
+    names = df["scenario"] if "scenario" in df else df.index
+    return pd.DataFrame(dict(
+        slots=slots, freight_pct=base["freight_pct"], short_pct=share[:, 0], medium_pct=share[:, 1],
+        path=np.asarray(names, dtype=object),
+        biofuel_pct=df["biofuel_pct"] if "biofuel_pct" in df else base.get("biofuel_pct", model.DEFAULTS["biofuel_pct"]),
+    ), index=df.index)
+
+
+def scenario_inputs(df: pd.DataFrame, unit=1.0, base=None) -> pd.DataFrame:
+    """The INPUTS columns for a table of scenarios."""
+    if f"{HAULS[0]} haul increase" in df and not set(PARAMS) & set(df):
+        return haul_change_inputs(df, unit, base)
+    base = {"biofuel_pct": model.DEFAULTS["biofuel_pct"], **base_scenario(base)}
+    return pd.DataFrame({p: df[p] if p in df else base[p] for p in INPUTS}, index=df.index)
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the scenario table at `path` (.xlsx, .csv or .parquet) in chunks."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xls"):
+        df = read_excel_cached(path)
+        if "scenario" in df:
+            df = df.set_index("scenario")
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    elif ext == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif ext in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            df = batch.to_pandas()
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            yield df
+    else:
+        raise ValueError(f"unsupported scenario file {path!r}; use .xlsx, .csv or .parquet")
+
+
+def evaluate(inputs: pd.DataFrame, metrics=METRICS) -> pd.DataFrame:
+    """Inputs plus `metrics` for every row of a scenario_inputs table."""
+    out = model.compute_batch(*(inputs[p].to_numpy() for p in INPUTS))
+    df = pd.DataFrame({p: out[p] for p in INPUTS}, index=inputs.index)
+    for m in metrics:
+        df[m] = out[m]
+    return df
+
+
+def _evaluate_chunk(df, unit, base, metrics):
+    return evaluate(scenario_inputs(df, unit, base), metrics)
+
+
+def iter_batch(path, chunk_size=CHUNK_SIZE, workers=None, unit=1.0, base=None, metrics=METRICS):
+    """Yield result DataFrames for the scenarios in `path`, chunk by chunk.
+    `workers` > 1 evaluates chunks in that many processes (0: one per CPU)."""
+    chunks = read_chunks(path, chunk_size)
+    if workers == 0:
+        workers = os.cpu_count()
+    if not workers or workers < 2:
+        for df in chunks:
+            yield _evaluate_chunk(df, unit, base, metrics)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep at most 2 chunks per worker in flight so reading stays lazy
+        pending = []
+        for df in chunks:
+            pending.append(pool.submit(_evaluate_chunk, df, unit, base, metrics))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def run(path, output, chunk_size=CHUNK_SIZE, workers=None, unit=1.0, base=None, metrics=METRICS):
+    """Evaluate `path` and stream the results to `output` (.parquet or .csv).
+    Returns the number of scenarios written."""
+    ext = os.path.splitext(output)[1].lower()
+    if ext not in (".parquet", ".pq", ".csv"):
+        raise ValueError(f"unsupported output file {output!r}; use .parquet or .csv")
+    writer, n = None, 0
+    try:
+        for df in iter_batch(path, chunk_size, workers, unit, base, metrics):
+            df = df.rename_axis("scenario").reset_index()
+            df["path"] = df["path"].astype(str)
+            if ext == ".csv":
+                df.to_csv(output, mode="w" if n == 0 else "a", header=n == 0, index=False)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            n += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a scenario library through the model.")
+    parser.add_argument("input", nargs="?", default="data/scenarios.xlsx", help=".xlsx, .csv or .parquet scenario table")
+    parser.add_argument("-o", "--output", default="scenario_kpis.parquet", help=".parquet or .csv results file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="processes (0: one per CPU)")
+    parser.add_argument("--unit", type=float, default=1.0, help="slots per unit of the haul increase/decrease columns")
+    args = parser.parse_args(argv)
+
+    n = run(args.input, args.output, args.chunk_size, args.workers, args.unit)
+    print(f"{n:,} scenarios -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
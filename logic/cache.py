@@ -0,0 +1,143 @@
+"""Bounded LRU cache for model results.
+
+Scenario inputs are normalized to ints before evaluation (see
+logic.model.normalize_inputs), so users moving sliders back and forth hit the
+same few keys. ResultCache keeps the most recently used results in memory,
+bounded by entry count and optionally by an estimated byte budget, and counts
+hits and misses. An optional SQLiteStore lets several processes (gunicorn
+workers) reuse each other's results through a shared file.
+"""
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value) -> int:
+    """Rough in-memory size of a result (arrays and frames dominate)."""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SQLiteStore:
+    """Pickled results in a SQLite file shared between processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _conn(self):
+        # One connection per thread and process: gunicorn forks preloaded
+        # workers, and a SQLite connection must not cross a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        try:
+            row = self._conn().execute("SELECT value FROM results WHERE key = ?", (repr(key),)).fetchone()
+        except sqlite3.Error:
+            return None
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, key, value):
+        try:
+            with self._conn() as conn:
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?)",
+                             (repr(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+        except sqlite3.Error:
+            pass  # the shared store is best effort; the memory cache still works
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM results")
+
+
+class ResultCache:
+    """Thread-safe LRU cache with an entry limit and an optional byte budget."""
+
+    def __init__(self, maxsize=256, max_bytes=None, store=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.store = store
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.store_hits = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                with self._lock:
+                    self.store_hits += 1
+                self._insert(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._insert(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _insert(self, key, value):
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._data:
+                self._nbytes -= self._data.pop(key)[1]
+            self._data[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while self._data and (
+                len(self._data) > self.maxsize
+                or (self.max_bytes is not None and self._nbytes > self.max_bytes and len(self._data) > 1)
+            ):
+                self._nbytes -= self._data.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self.hits = self.misses = self.store_hits = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, store_hits=self.store_hits,
+                        entries=len(self._data), nbytes=self._nbytes,
+                        maxsize=self.maxsize, max_bytes=self.max_bytes,
+                        shared=self.store.path if self.store is not None else None)
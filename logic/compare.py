@@ -0,0 +1,77 @@
+"""Pinned scenarios and their differences with the active one.
+
+Pinned scenarios are kept as compact summaries in PINNED, a result cache of
+their own, so slider moves (which fill RESULT_CACHE) never evict them: a
+pinned scenario is evaluated once, when it is pinned. Several missing
+summaries are evaluated in one compute_batch call. A summary holds
+
+    metrics      (len(METRICS),) values in METRICS order
+    seg          (len(SEGMENTS), len(SEGMENT_QUANTITIES)) in SEGMENTS order
+    noise_delta  the Lden change, from which model.lden_sim gives the polygons
+
+The active scenario is summarized from its (cached) compute_all result, so
+comparing costs one model evaluation for the active scenario and array
+differences against the stacked pinned summaries.
+"""
+import numpy as np
+
+from logic import model
+from logic.cache import ResultCache
+
+MAX_PINNED = 5
+METRICS = (
+    "va_direct", "va_indirect", "jobs_direct", "jobs_indirect", "total_pax", "total_cargo_freight",
+    "total_cargo_belly", "co2", "homes", "people_worse", "noise_delta",
+)
+# compute_all segment column -> compute_batch key
+SEGMENT_QUANTITIES = dict(Slots="seg_slots", AddedValue="seg_added_value", Jobs="seg_jobs", Pax="seg_pax",
+                          Cargo="seg_cargo", CO2="seg_co2")
+
+PINNED = ResultCache(maxsize=64)
+
+
+def _key(inputs):
+    return (model.model_version(),) + model.normalize_inputs(*inputs)
+
+
+def summary(result) -> dict:
+    """Summary of a compute_all result."""
+    seg = result["seg"].set_index("Segment").loc[model.SEGMENT_LABELS]
+    return dict(
+        metrics=np.array([result[m] for m in METRICS], dtype=float),
+        seg=seg[list(SEGMENT_QUANTITIES)].to_numpy(dtype=float),
+        noise_delta=float(result["noise_delta"]),
+    )
+
+
+def pinned(inputs_list) -> list:
+    """Summaries of pinned scenarios (model input tuples, see
+    model.normalize_inputs), from PINNED or evaluated in one batch."""
+    keys = [_key(inputs) for inputs in inputs_list]
+    found = {k: PINNED.get(k) for k in dict.fromkeys(keys)}
+    missing = [k for k, v in found.items() if v is None]
+    if missing:
+        columns = list(zip(*(k[1:] for k in missing)))
+        out = model.compute_batch(*columns[:4], path_name=np.array(columns[4], dtype=object), biofuel_pct=columns[5])
+        for i, k in enumerate(missing):
+            found[k] = dict(
+                metrics=np.array([out[m][i] for m in METRICS], dtype=float),
+                seg=np.stack([out[q][i] for q in SEGMENT_QUANTITIES.values()], axis=1),
+                noise_delta=float(out["noise_delta"][i]),
+            )
+            PINNED.put(k, found[k])
+    return [found[k] for k in keys]
+
+
+def differences(active, others) -> dict:
+    """Active minus each pinned summary: `metrics` (P, metrics) and `seg`
+    (P, segments, quantities), plus the stacked pinned values themselves."""
+    metrics = np.stack([o["metrics"] for o in others]) if others else np.zeros((0, len(METRICS)))
+    seg = np.stack([o["seg"] for o in others]) if others else np.zeros((0,) + active["seg"].shape)
+    return dict(metrics=active["metrics"][None, :] - metrics, seg=active["seg"][None] - seg,
+                pinned_metrics=metrics, pinned_seg=seg)
+
+
+def lden_difference(active, other) -> np.ndarray:
+    """Per-polygon Lden of the active scenario minus that of `other`."""
+    return model.lden_sim(active["noise_delta"]) - model.lden_sim(other["noise_delta"])
@@ -0,0 +1,84 @@
+"""Binary cache for the Excel inputs in data/.
+
+Parsing .xlsx with openpyxl is the slowest part of a cold start. The first
+read of a workbook stores the parsed sheet as Parquet under data/.cache/,
+together with a small manifest holding the source's mtime, size and SHA-256.
+Later reads use the Parquet file as long as the source is unchanged:
+
+- mtime and size match the manifest: read the cache directly;
+- otherwise hash the source; same hash: refresh the manifest, read the cache;
+- different hash: parse the workbook again and rewrite the cache.
+
+If the cache directory is not writable the workbook is parsed as before.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+CACHE_DIR = os.path.join("data", ".cache")
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _manifest_path(path):
+    return os.path.join(CACHE_DIR, os.path.basename(path) + ".json")
+
+
+def _load_manifest(path):
+    try:
+        with open(_manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(path, manifest):
+    tmp = _manifest_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, _manifest_path(path))
+
+
+def read_excel_cached(path, **kwargs) -> pd.DataFrame:
+    """`pd.read_excel(path, **kwargs)`, served from the Parquet cache when fresh."""
+    st = os.stat(path)
+    manifest = _load_manifest(path)
+    if manifest is not None and manifest.get("kwargs") == repr(sorted(kwargs.items())):
+        cached = os.path.join(CACHE_DIR, manifest["parquet"])
+        try:
+            if manifest["mtime_ns"] == st.st_mtime_ns and manifest["size"] == st.st_size:
+                return pd.read_parquet(cached)
+            if manifest["sha256"] == _sha256(path):
+                df = pd.read_parquet(cached)
+                manifest.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+                _write_manifest(path, manifest)
+                return df
+        except (OSError, ValueError):
+            pass  # stale or unreadable cache: fall through and rebuild
+
+    df = pd.read_excel(path, **kwargs)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        digest = _sha256(path)
+        name = f"{os.path.basename(path)}-{digest[:16]}.parquet"
+        df.to_parquet(os.path.join(CACHE_DIR, name))
+        if manifest is not None and manifest.get("parquet") not in (None, name):
+            try:
+                os.remove(os.path.join(CACHE_DIR, manifest["parquet"]))
+            except OSError:
+                pass
+        _write_manifest(path, dict(
+            parquet=name, sha256=digest, mtime_ns=st.st_mtime_ns, size=st.st_size,
+            kwargs=repr(sorted(kwargs.items())),
+        ))
+    except (OSError, ImportError, ValueError):
+        pass
+    return df
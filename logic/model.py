@@ -1,71 +1,71 @@
+import hashlib
+import os
 import numpy as np
 import pandas as pd
-from typing import Optional
-import geopandas as gpd
 
-scenarios = pd.read_excel('data/scenarios.xlsx').set_index('scenario')
-haul_dist = pd.read_excel('data/haul_distributions.xlsx').set_index('type')
-econ_fact = pd.read_excel('data/economische_factoren.xlsx').set_index('type')
+from logic.cache import ResultCache, SQLiteStore
+from logic.input_cache import read_excel_cached
+from logic.noise_data import NOISE_PATH, noise_columns, noise_gdf
+
+# Parsed once, then served from the Parquet cache in data/.cache (see logic.input_cache)
+scenarios = read_excel_cached('data/scenarios.xlsx').set_index('scenario')
+haul_dist = read_excel_cached('data/haul_distributions.xlsx').set_index('type')
+econ_fact = read_excel_cached('data/economische_factoren.xlsx').set_index('type')
 
 SEGMENTS = [
     ("Passengers", "Short"), ("Passengers", "Medium"), ("Passengers", "Long"),
     ("Freight", "Short"), ("Freight", "Medium"), ("Freight", "Long"),
 ]
+SEGMENT_LABELS = [f"{ptype} - {h}" for ptype, h in SEGMENTS]
+# haul_dist row for every segment, in SEGMENTS order
+SEGMENT_ROWS = [f"{h.lower()} haul {'pax' if ptype == 'Passengers' else 'cargo'}" for ptype, h in SEGMENTS]
+_IS_PAX = np.array([ptype == "Passengers" for ptype, _ in SEGMENTS])
+_HAUL_IDX = np.array([["Short", "Medium", "Long"].index(h) for _, h in SEGMENTS])
 
 HAUL_PAX = {"Short": haul_dist.loc['short haul pax']['num_passengers'], 
             "Medium": haul_dist.loc['medium haul pax']['num_passengers'], 
             "Long": haul_dist.loc['long haul pax']['num_passengers']}
 
-ADDED_VALUE_PER_SLOT = {
-    ("Passengers", "Short"): haul_dist.loc['short haul pax']['num_passengers']*econ_fact.loc['pax']['added_value_schiphol'] + 
-    haul_dist.loc['short haul pax']['num_passengers']*haul_dist.loc['short haul pax']['frac_tourist']*econ_fact.loc['pax']['added_value_tourist'] + 
-    haul_dist.loc['short haul pax']['num_passengers']*haul_dist.loc['short haul pax']['frac_business']*econ_fact.loc['pax']['added_value_business'] + 
-    haul_dist.loc['short haul pax']['cargo_volume']*econ_fact.loc['cargo']['added_value_schiphol'], 
-    ("Passengers", "Medium"): haul_dist.loc['medium haul pax']['num_passengers']*econ_fact.loc['pax']['added_value_schiphol'] + 
-    haul_dist.loc['medium haul pax']['num_passengers']*haul_dist.loc['medium haul pax']['frac_tourist']*econ_fact.loc['pax']['added_value_tourist'] + 
-    haul_dist.loc['medium haul pax']['num_passengers']*haul_dist.loc['medium haul pax']['frac_business']*econ_fact.loc['pax']['added_value_business'] + 
-    haul_dist.loc['medium haul pax']['cargo_volume']*econ_fact.loc['cargo']['added_value_schiphol'], 
-    ("Passengers", "Long"): haul_dist.loc['long haul pax']['num_passengers']*econ_fact.loc['pax']['added_value_schiphol'] + 
-    haul_dist.loc['long haul pax']['num_passengers']*haul_dist.loc['long haul pax']['frac_tourist']*econ_fact.loc['pax']['added_value_tourist'] + 
-    haul_dist.loc['long haul pax']['num_passengers']*haul_dist.loc['long haul pax']['frac_business']*econ_fact.loc['pax']['added_value_business'] + 
-    haul_dist.loc['long haul pax']['cargo_volume']*econ_fact.loc['cargo']['added_value_schiphol'],
-    ("Freight", "Short"): haul_dist.loc['short haul cargo']['cargo_volume']*econ_fact.loc['cargo']['added_value_schiphol'], 
-    ("Freight", "Medium"):  haul_dist.loc['medium haul cargo']['cargo_volume']*econ_fact.loc['cargo']['added_value_schiphol'], 
-    ("Freight", "Long"):  haul_dist.loc['long haul cargo']['cargo_volume']*econ_fact.loc['cargo']['added_value_schiphol'],
-}
-EMPLOYMENT_PER_SLOT = {
-    ("Passengers", "Short"): haul_dist.loc['short haul pax']['num_passengers']*econ_fact.loc['pax']['employment_schiphol'] + 
-    haul_dist.loc['short haul pax']['num_passengers']*haul_dist.loc['short haul pax']['frac_tourist']*econ_fact.loc['pax']['employment_tourist'] + 
-    haul_dist.loc['short haul pax']['num_passengers']*haul_dist.loc['short haul pax']['frac_business']*econ_fact.loc['pax']['employment_business'] + 
-    haul_dist.loc['short haul pax']['cargo_volume']*econ_fact.loc['cargo']['employment_schiphol'], 
-    ("Passengers", "Medium"): haul_dist.loc['medium haul pax']['num_passengers']*econ_fact.loc['pax']['employment_schiphol'] + 
-    haul_dist.loc['medium haul pax']['num_passengers']*haul_dist.loc['medium haul pax']['frac_tourist']*econ_fact.loc['pax']['employment_tourist'] + 
-    haul_dist.loc['medium haul pax']['num_passengers']*haul_dist.loc['medium haul pax']['frac_business']*econ_fact.loc['pax']['employment_business'] + 
-    haul_dist.loc['medium haul pax']['cargo_volume']*econ_fact.loc['cargo']['employment_schiphol'], 
-    ("Passengers", "Long"): haul_dist.loc['long haul pax']['num_passengers']*econ_fact.loc['pax']['employment_schiphol'] + 
-    haul_dist.loc['long haul pax']['num_passengers']*haul_dist.loc['long haul pax']['frac_tourist']*econ_fact.loc['pax']['employment_tourist'] + 
-    haul_dist.loc['long haul pax']['num_passengers']*haul_dist.loc['long haul pax']['frac_business']*econ_fact.loc['pax']['employment_business'] + 
-    haul_dist.loc['long haul pax']['cargo_volume']*econ_fact.loc['cargo']['employment_schiphol'],
-    ("Freight", "Short"): haul_dist.loc['short haul cargo']['cargo_volume']*econ_fact.loc['cargo']['employment_schiphol'], 
-    ("Freight", "Medium"): haul_dist.loc['medium haul cargo']['cargo_volume']*econ_fact.loc['cargo']['employment_schiphol'], 
-    ("Freight", "Long"): haul_dist.loc['long haul cargo']['cargo_volume']*econ_fact.loc['cargo']['employment_schiphol'],
-}
-PAX_PER_SLOT = {
-    ("Passengers", "Short"): haul_dist.loc['short haul pax']['num_passengers'], 
-    ("Passengers", "Medium"): haul_dist.loc['medium haul pax']['num_passengers'], 
-    ("Passengers", "Long"): haul_dist.loc['long haul pax']['num_passengers'],
-    ("Freight", "Short"): 0, 
-    ("Freight", "Medium"): 0, 
-    ("Freight", "Long"): 0,
-}
-CARGO_PER_SLOT = {
-    ("Passengers", "Short"): haul_dist.loc['short haul pax']['cargo_volume'], 
-    ("Passengers", "Medium"): haul_dist.loc['medium haul pax']['cargo_volume'], 
-    ("Passengers", "Long"): haul_dist.loc['long haul pax']['cargo_volume'],
-    ("Freight", "Short"): haul_dist.loc['short haul cargo']['cargo_volume'], 
-    ("Freight", "Medium"): haul_dist.loc['medium haul cargo']['cargo_volume'], 
-    ("Freight", "Long"): haul_dist.loc['long haul cargo']['cargo_volume'],
-}
+# Columnar layout of the per-slot coefficients: one row per segment (SEGMENTS
+# order), one column per quantity in COEF_COLUMNS.
+COEF_COLUMNS = ["AddedValue", "Jobs", "Pax", "Cargo"]
+
+
+def segment_coefficients(haul: pd.DataFrame, econ: pd.DataFrame) -> np.ndarray:
+    """Per-slot coefficients (len(SEGMENTS) x len(COEF_COLUMNS)) from the input tables."""
+    rows = haul.loc[SEGMENT_ROWS]
+    return coefficient_matrix(
+        rows['num_passengers'].to_numpy(dtype=float), rows['frac_tourist'].to_numpy(dtype=float),
+        rows['frac_business'].to_numpy(dtype=float), rows['cargo_volume'].to_numpy(dtype=float),
+        econ.loc['pax'], econ.loc['cargo'],
+    )
+
+
+def coefficient_matrix(num_pax, frac_tourist, frac_business, cargo, pax, freight) -> np.ndarray:
+    """segment_coefficients on arrays: the haul columns have SEGMENTS as last
+    axis and `pax`/`freight` map the economic factors to values broadcasting
+    against them, so a leading sample axis gives (samples, segments, quantities).
+
+    Per slot, a segment adds the Schiphol, tourist and business effects of its
+    passengers plus the Schiphol effect of its cargo. Freight rows carry no
+    passengers, so the same expression covers both segment types.
+    """
+    def per_slot(kind):
+        return (num_pax*pax[f'{kind}_schiphol'] +
+                num_pax*frac_tourist*pax[f'{kind}_tourist'] +
+                num_pax*frac_business*pax[f'{kind}_business'] +
+                cargo*freight[f'{kind}_schiphol'])
+
+    num_pax, cargo = np.broadcast_arrays(num_pax, cargo)
+    return np.stack([per_slot('added_value'), per_slot('employment'), np.where(_IS_PAX, num_pax, 0.0), cargo], axis=-1)
+
+
+SEGMENT_COEFS = segment_coefficients(haul_dist, econ_fact)
+
+ADDED_VALUE_PER_SLOT = dict(zip(SEGMENTS, SEGMENT_COEFS[:, 0]))
+EMPLOYMENT_PER_SLOT = dict(zip(SEGMENTS, SEGMENT_COEFS[:, 1]))
+PAX_PER_SLOT = dict(zip(SEGMENTS, SEGMENT_COEFS[:, 2]))
+CARGO_PER_SLOT = dict(zip(SEGMENTS, SEGMENT_COEFS[:, 3]))
 
 
 INDIRECT_MULT = 1.6
@@ -85,85 +85,291 @@ DEFAULTS = dict(
 )
 
 # Optional external noise polygons (GeoDataFrame with columns: geometry, Lden, households)
-NOISE_GDF: Optional["gpd.GeoDataFrame"] = gpd.read_feather("data/lden.ftr")
+# Shared and read-only: scenario evaluations never copy or modify it. The
+# model itself only needs the attribute columns, so the GeoDataFrame (and
+# geopandas) is loaded on first access of model.NOISE_GDF.
+def __getattr__(name):
+    if name == "NOISE_GDF":
+        return noise_gdf()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def compute_all(slots, freight_pct, short_pct, medium_pct, path_name):
-    # deterministic computations; no randomness needed for linear relationships
-# np.random.seed(7)  # removed to keep outputs strictly deterministic
-    slots = int(round(slots or 0)); freight_pct = int(round(freight_pct or 0)); short_pct = int(round(short_pct or 0)); medium_pct = int(round(medium_pct or 0))
-    passengers_pct = max(0, 100 - freight_pct)
-    long_pct = max(0, 100 - short_pct - medium_pct)
 
-    path = PATHS.get(path_name, PATHS["Hub optimized"]) if path_name in PATHS else PATHS["Hub optimized"]
+# Relative sound exposure of one movement per segment (dB). Longer hauls fly
+# heavier aircraft; freighters are on average older and louder types.
+NOISE_DB_PER_MOVEMENT = {
+    ("Passengers", "Short"): 0.0, ("Passengers", "Medium"): 1.5, ("Passengers", "Long"): 4.0,
+    ("Freight", "Short"): 2.0, ("Freight", "Medium"): 4.0, ("Freight", "Long"): 6.0,
+}
+_NOISE_ENERGY = 10 ** (np.array([NOISE_DB_PER_MOVEMENT[s] for s in SEGMENTS]) / 10)
+# Lowest level change reported when (almost) all traffic is removed
+NOISE_MIN_DELTA_DB = -30.0
+# Lden change (dB) that counts as improved / worsened for a polygon
+NOISE_THRESHOLD_DB = 1
 
-    seg_shares = {}
-    for ptype, h in SEGMENTS:
-        top = passengers_pct if ptype == "Passengers" else freight_pct
-        haul_share = {"Short": short_pct, "Medium": medium_pct, "Long": long_pct}[h]
-        seg_shares[(ptype, h)] = max(0, top)/100 * max(0, haul_share)/100
+# CO2 per movement and segment (tonnes). A flight is two movements, so a
+# movement carries half of a flight: average stage length x fuel burn per km
+# x CO2 per kg of kerosene. Freighters fly older, heavier types per haul.
+HAUL_DISTANCE_KM = {"Short": 800, "Medium": 2500, "Long": 7000}
+FUEL_KG_PER_KM = {
+    ("Passengers", "Short"): 3.0, ("Passengers", "Medium"): 3.6, ("Passengers", "Long"): 7.5,
+    ("Freight", "Short"): 4.5, ("Freight", "Medium"): 6.5, ("Freight", "Long"): 11.0,
+}
+CO2_PER_KG_FUEL = 3.16
+CO2_PER_MOVEMENT = np.array([HAUL_DISTANCE_KM[h] * FUEL_KG_PER_KM[(p, h)] * CO2_PER_KG_FUEL / 2 / 1000 for p, h in SEGMENTS])
+# Life-cycle CO2 saved by a tonne of biofuel relative to kerosene
+BIOFUEL_CO2_REDUCTION = 0.8
 
-    results = []; total_va_direct = 0.0; total_jobs_direct = 0.0
+# Per-polygon arrays and population aggregates only depend on the dataset, so
+# they are prepared once at load time. `diff` is the Lden change per polygon at
+# the reference (DEFAULTS) traffic; scenarios shift it by their noise delta.
+if os.path.exists(NOISE_PATH):
+    _noise = noise_columns()
+    NOISE_DIFF = _noise["diff"]
+    NOISE_POP = _noise["aantalInwoners"]
+else:
+    # Fallback: no polygons; KPI 0 so user knows to load polygons
+    NOISE_DIFF = np.zeros(0)
+    NOISE_POP = np.zeros(0, dtype=np.int64)
+_order = np.argsort(NOISE_DIFF, kind="stable")
+_SORTED_DIFF = NOISE_DIFF[_order]
+_CUM_POP = np.concatenate([[0], np.cumsum(NOISE_POP[_order], dtype=np.int64)])
+HOMES_AFFECTED = int(_CUM_POP[np.searchsorted(_SORTED_DIFF, -NOISE_THRESHOLD_DB, side="left")])
 
-    # Aggregate a simple noise intensity proxy based on fleet mix (nf)
-    noise_intensity = 0.0
+# (short, medium, long) volumes used by the cargo/passenger totals
+_CARGO_FREIGHT = [haul_dist.loc[f'{h} haul cargo']['cargo_volume'] for h in ("short", "medium", "long")]
+_CARGO_BELLY = [haul_dist.loc[f'{h} haul pax']['cargo_volume'] for h in ("short", "medium", "long")]
+_NUM_PAX = [haul_dist.loc[f'{h} haul pax']['num_passengers'] for h in ("short", "medium", "long")]
 
-    for (ptype, h) in SEGMENTS:
-        share = seg_shares[(ptype, h)]
-        seg_slots = max(0.0, slots * share)
-        row_label = f"{ptype} - {h}"
 
-        va = seg_slots * ADDED_VALUE_PER_SLOT[(ptype, h)]
-        jobs = seg_slots * EMPLOYMENT_PER_SLOT[(ptype, h)]
-        total_va_direct += va; total_jobs_direct += jobs
-        pax = seg_slots * PAX_PER_SLOT[(ptype, h)]/1000000
-        cargo = seg_slots * CARGO_PER_SLOT[(ptype, h)]/1000000
+def _as_int_array(values):
+    # Vectorized equivalent of int(round(v or 0)): None becomes NaN -> 0, and
+    # np.rint rounds half to even like round()
+    return np.rint(np.nan_to_num(np.asarray(values, dtype=float))).astype(np.int64)
 
-        results.append(dict(Segment=row_label, Slots=seg_slots, AddedValue=va, Jobs=jobs, Pax = pax, Cargo = cargo))
 
-    df = pd.DataFrame(results)
-    if not df.empty:
-        df.sort_values("AddedValue", ascending=False, inplace=True)
+def _segment_slots(slots, freight_pct, short_pct, medium_pct):
+    # Slots per segment (N x segments) for normalized integer inputs
+    passengers_pct = np.maximum(0, 100 - freight_pct)
+    long_pct = np.maximum(0, 100 - short_pct - medium_pct)
 
-    # Choropleth path: if NOISE_GDF is provided, create a simulated Lden column responsive to scenario
-    if NOISE_GDF is not None:
-        noise_gdf = NOISE_GDF.copy()
-        base_col = "diff"
-        # scale around baseline: make a gentle 0-centered adjustment factor
-        # normalizer based on default slots
-        default_slots = DEFAULTS["slots"]
-        scale = (noise_intensity / max(1.0, default_slots))
-        # create simulated column used by the choropleth
-        # KPI computation (households above threshold)
-        homes_affected = int(noise_gdf.loc[noise_gdf["diff"] < -1]['aantalInwoners'].sum())
-    else:
-        # Fallback: no polygons; KPI 0 so user knows to load polygons
-        homes_affected = 0
+    top = np.where(_IS_PAX, passengers_pct[:, None], freight_pct[:, None])
+    haul_share = np.stack([short_pct, medium_pct, long_pct], axis=1)[:, _HAUL_IDX]
+    seg_shares = np.maximum(0, top)/100 * np.maximum(0, haul_share)/100
 
-    va_indirect = total_va_direct * (INDIRECT_MULT-1)
-    jobs_indirect = int(total_jobs_direct * (INDIRECT_MULT-1))
-
-    total_cargo_freight = (slots*(freight_pct*short_pct/10000)*haul_dist.loc['short haul cargo']['cargo_volume'] + 
-                   slots*(freight_pct*medium_pct/10000)*haul_dist.loc['medium haul cargo']['cargo_volume'] + 
-                   slots*(freight_pct*(100-(short_pct+medium_pct))/10000)*haul_dist.loc['long haul cargo']['cargo_volume'])
-    total_cargo_belly = ( +
-                   slots*((100-freight_pct)*short_pct/10000)*haul_dist.loc['short haul pax']['cargo_volume'] + 
-                   slots*((100-freight_pct)*medium_pct/10000)*haul_dist.loc['medium haul pax']['cargo_volume'] + 
-                   slots*((100-freight_pct)*(100-(short_pct+medium_pct))/10000)*haul_dist.loc['long haul pax']['cargo_volume'])
-    
-    total_pax = (slots*((100-freight_pct)*short_pct/10000)*haul_dist.loc['short haul pax']['num_passengers'] + 
-                   slots*((100-freight_pct)*medium_pct/10000)*haul_dist.loc['medium haul pax']['num_passengers'] + 
-                   slots*((100-freight_pct)*(100-(short_pct+medium_pct))/10000)*haul_dist.loc['long haul pax']['num_passengers'] 
+    return np.maximum(0.0, slots[:, None] * seg_shares), long_pct
+
+
+def _noise_energy(seg_slots):
+    # Summed movement energy per scenario; explicit accumulation keeps the
+    # result independent of the batch size
+    seg_slots = np.asarray(seg_slots, dtype=float)
+    energy = np.zeros(seg_slots.shape[:-1])
+    for j in range(len(SEGMENTS)):
+        energy += seg_slots[..., j] * _NOISE_ENERGY[j]
+    return energy
+
+
+_NOISE_REF = float(_noise_energy(_segment_slots(
+    *(np.array([DEFAULTS[k]]) for k in ("slots", "freight_share", "short_pct", "medium_pct"))
+)[0])[0])
+
+
+def noise_delta(seg_slots):
+    """Lden change (dB) versus the reference traffic: 10*log10 of the summed
+    movement energy of all segments relative to the DEFAULTS scenario."""
+    ratio = np.maximum(_noise_energy(seg_slots) / _NOISE_REF, 10 ** (NOISE_MIN_DELTA_DB / 10))
+    return 10 * np.log10(ratio)
+
+
+def lden_sim(delta=0.0):
+    """Simulated Lden change per polygon (NOISE_GDF row order) for a noise delta."""
+    return NOISE_DIFF + delta
+
+
+def people_improved(delta):
+    """Inhabitants of polygons whose Lden drops by more than NOISE_THRESHOLD_DB."""
+    idx = np.searchsorted(_SORTED_DIFF, -NOISE_THRESHOLD_DB - np.asarray(delta), side="left")
+    return _CUM_POP[idx]
+
+
+def people_worse(delta):
+    """Inhabitants of polygons whose Lden rises by more than NOISE_THRESHOLD_DB."""
+    idx = np.searchsorted(_SORTED_DIFF, NOISE_THRESHOLD_DB - np.asarray(delta), side="right")
+    return _CUM_POP[-1] - _CUM_POP[idx]
+
+
+def compute_batch(slots, freight_pct, short_pct, medium_pct, path_name=None, biofuel_pct=None):
+    """Evaluate N scenarios at once.
+
+    Arguments are equal-length sequences (scalars broadcast). Returns a dict of
+    NumPy arrays: the scalar KPIs of `compute_all` with shape (N,) and the
+    per-segment results (`seg_slots`, `seg_added_value`, `seg_jobs`, `seg_pax`,
+    `seg_cargo`, `seg_co2`) with shape (N, len(SEGMENTS)), columns in SEGMENTS
+    order. Per-polygon noise levels are not materialized; use
+    `lden_sim(noise_delta)`. Values are identical to what `compute_all`
+    returns for each scenario.
+    """
+    biofuel_pct = DEFAULTS["biofuel_pct"] if biofuel_pct is None else biofuel_pct
+    slots, freight_pct, short_pct, medium_pct, biofuel_pct = np.broadcast_arrays(
+        *(np.atleast_1d(_as_int_array(v)) for v in (slots, freight_pct, short_pct, medium_pct, biofuel_pct))
     )
+    return _batch(slots, freight_pct, short_pct, medium_pct, path_name, biofuel_pct)
+
+
+def _batch(slots, freight_pct, short_pct, medium_pct, path_name, biofuel_pct):
+    # compute_batch on equal-length 1-d input arrays, as given: integers for
+    # the dashboard model, fractional values for interpolated trajectories
+    n = len(slots)
+    names = np.broadcast_to(np.asarray(path_name if path_name is not None else DEFAULTS["path"], dtype=object), (n,))
+    path = np.array([p if p in PATHS else "Hub optimized" for p in names], dtype=object)
+    known, which = np.unique(path.astype(str), return_inverse=True)
+    efficiency = np.array([PATHS[p]["efficiency"] for p in known])[which.reshape(-1)]
+
+    seg_slots, long_pct = _segment_slots(slots, freight_pct, short_pct, medium_pct)
+    # (N, segments, quantities) in one pass over the coefficient matrix
+    seg = seg_slots[:, :, None] * SEGMENT_COEFS[None, :, :]
+    seg[:, :, 2:] /= 1000000
+
+    # Accumulate in SEGMENTS order so the totals match the scalar model bit for bit
+    total_va_direct = np.zeros(n); total_jobs_direct = np.zeros(n)
+    for j in range(len(SEGMENTS)):
+        total_va_direct += seg[:, j, 0]; total_jobs_direct += seg[:, j, 1]
+
+    # CO2 (Mt): fuel burn per movement, less the path's efficiency gain, and
+    # the life-cycle saving of the biofuel share
+    co2_factor = (1 - efficiency) * (1 - np.clip(biofuel_pct, 0, 100) / 100 * BIOFUEL_CO2_REDUCTION) / 1000000
+    seg_co2 = seg_slots * CO2_PER_MOVEMENT[None, :] * co2_factor[:, None]
+    total_co2 = np.zeros(n)
+    for j in range(len(SEGMENTS)):
+        total_co2 += seg_co2[:, j]
+
+    # Noise: one log-sum per scenario; polygon levels follow from lden_sim(delta)
+    delta = noise_delta(seg_slots)
+
+    va_indirect = total_va_direct * (INDIRECT_MULT-1)
+    jobs_indirect = np.trunc(total_jobs_direct * (INDIRECT_MULT-1)).astype(np.int64)
+
+    hauls = (freight_pct*short_pct/10000, freight_pct*medium_pct/10000, freight_pct*(100-(short_pct+medium_pct))/10000)
+    total_cargo_freight = slots*hauls[0]*_CARGO_FREIGHT[0] + slots*hauls[1]*_CARGO_FREIGHT[1] + slots*hauls[2]*_CARGO_FREIGHT[2]
+    pax_pct = 100-freight_pct
+    hauls = (pax_pct*short_pct/10000, pax_pct*medium_pct/10000, pax_pct*(100-(short_pct+medium_pct))/10000)
+    total_cargo_belly = slots*hauls[0]*_CARGO_BELLY[0] + slots*hauls[1]*_CARGO_BELLY[1] + slots*hauls[2]*_CARGO_BELLY[2]
+    total_pax = slots*hauls[0]*_NUM_PAX[0] + slots*hauls[1]*_NUM_PAX[1] + slots*hauls[2]*_NUM_PAX[2]
+
     return dict(
+        slots=slots,
+        freight_pct=freight_pct,
+        short_pct=short_pct,
+        medium_pct=medium_pct,
+        path=path,
+        biofuel_pct=biofuel_pct,
         long_pct=long_pct,
-        seg=df,
-        homes=homes_affected,
+        noise_delta=delta,
+        homes=people_improved(delta),
+        people_worse=people_worse(delta),
         va_direct=total_va_direct/1000000,
         va_indirect=va_indirect/1000000,
-        jobs_direct=int(total_jobs_direct),
+        jobs_direct=np.trunc(total_jobs_direct).astype(np.int64),
         jobs_indirect=jobs_indirect,
-        noise_gdf=noise_gdf,
-        total_cargo_freight  = total_cargo_freight/1000000,
-        total_cargo_belly =  total_cargo_belly/1000000,
-        total_pax = total_pax/1000000
+        total_cargo_freight=total_cargo_freight/1000000,
+        total_cargo_belly=total_cargo_belly/1000000,
+        total_pax=total_pax/1000000,
+        co2=total_co2,
+        seg_slots=seg_slots,
+        seg_added_value=seg[:, :, 0],
+        seg_jobs=seg[:, :, 1],
+        seg_pax=seg[:, :, 2],
+        seg_cargo=seg[:, :, 3],
+        seg_co2=seg_co2,
+    )
+
+
+def normalize_inputs(slots, freight_pct, short_pct, medium_pct, path_name, biofuel_pct=None):
+    """The (slots, freight_pct, short_pct, medium_pct, path, biofuel_pct) tuple
+    compute_all actually evaluates: ints as rounded by the model and a known
+    path name. Inputs with the same normalized tuple give identical results."""
+    biofuel_pct = DEFAULTS["biofuel_pct"] if biofuel_pct is None else biofuel_pct
+    slots, freight_pct, short_pct, medium_pct, biofuel_pct = (
+        int(round(v or 0)) for v in (slots, freight_pct, short_pct, medium_pct, biofuel_pct))
+    return slots, freight_pct, short_pct, medium_pct, path_name if path_name in PATHS else "Hub optimized", biofuel_pct
+
+
+# Results are cached per normalized input tuple. Size and the optional shared
+# SQLite file (for all gunicorn workers) come from the environment:
+#   MAINPORT_CACHE_SIZE  max entries (default 256)
+#   MAINPORT_CACHE_MB    byte budget in MiB (default: entries only)
+#   MAINPORT_CACHE_DB    path of the shared on-disk cache (default: none)
+RESULT_CACHE: ResultCache = None
+
+# Prefix for cache keys: changes whenever coefficients or noise data change,
+# so a shared on-disk cache never serves results of other inputs.
+_CACHE_NAMESPACE = hashlib.sha1(b"".join(
+    np.ascontiguousarray(a).tobytes() for a in (SEGMENT_COEFS, _NOISE_ENERGY, CO2_PER_MOVEMENT, NOISE_DIFF, NOISE_POP)
+)).hexdigest()[:12]
+
+
+def configure_cache(maxsize=256, max_bytes=None, shared_path=None):
+    """Replace the result cache, e.g. to change its size or share it on disk."""
+    global RESULT_CACHE
+    RESULT_CACHE = ResultCache(maxsize, max_bytes, SQLiteStore(shared_path) if shared_path else None)
+    return RESULT_CACHE
+
+
+configure_cache(
+    maxsize=int(os.environ.get("MAINPORT_CACHE_SIZE", 256)),
+    max_bytes=float(os.environ["MAINPORT_CACHE_MB"]) * 2**20 if os.environ.get("MAINPORT_CACHE_MB") else None,
+    shared_path=os.environ.get("MAINPORT_CACHE_DB") or None,
+)
+
+
+def model_version() -> str:
+    """Identifies the coefficients and noise data results were computed with."""
+    return _CACHE_NAMESPACE
+
+
+def remember(key, result):
+    """Put a result computed earlier for the normalized inputs `key` (e.g.
+    stored with a shared scenario) into RESULT_CACHE."""
+    RESULT_CACHE.put((_CACHE_NAMESPACE,) + tuple(key), result)
+
+
+def compute_all(slots, freight_pct, short_pct, medium_pct, path_name, biofuel_pct=None):
+    """Model outputs for one scenario, served from RESULT_CACHE when possible.
+    The returned values are shared with the cache: do not modify them."""
+    key = normalize_inputs(slots, freight_pct, short_pct, medium_pct, path_name, biofuel_pct)
+    return RESULT_CACHE.get_or_compute((_CACHE_NAMESPACE,) + key, lambda: _evaluate(*key))
+
+
+def _evaluate(slots, freight_pct, short_pct, medium_pct, path_name, biofuel_pct):
+    # deterministic computations; no randomness needed for linear relationships
+    # single-scenario view on the batch engine
+    b = compute_batch([slots], [freight_pct], [short_pct], [medium_pct], [path_name], [biofuel_pct])
+
+    df = pd.DataFrame(dict(
+        Segment=SEGMENT_LABELS,
+        Slots=b["seg_slots"][0],
+        AddedValue=b["seg_added_value"][0],
+        Jobs=b["seg_jobs"][0],
+        Pax=b["seg_pax"][0],
+        Cargo=b["seg_cargo"][0],
+        CO2=b["seg_co2"][0],
+    ))
+    if not df.empty:
+        df.sort_values("AddedValue", ascending=False, inplace=True)
+
+    return dict(
+        long_pct=int(b["long_pct"][0]),
+        seg=df,
+        homes=int(b["homes"][0]),
+        people_worse=int(b["people_worse"][0]),
+        noise_delta=b["noise_delta"][0],
+        lden_sim=lden_sim(b["noise_delta"][0]),
+        va_direct=b["va_direct"][0],
+        va_indirect=b["va_indirect"][0],
+        jobs_direct=int(b["jobs_direct"][0]),
+        jobs_indirect=int(b["jobs_indirect"][0]),
+        total_cargo_freight=b["total_cargo_freight"][0],
+        total_cargo_belly=b["total_cargo_belly"][0],
+        total_pax=b["total_pax"][0],
+        co2=b["co2"][0],
     )
@@ -0,0 +1,70 @@
+"""Single provider for the noise polygons in data/lden.ftr.
+
+The Feather file is opened once per process as a memory-mapped Arrow table.
+Attribute columns are exposed as read-only NumPy views on that mapping (no
+copy), and the GeoDataFrame built on top of them is shared by the app and the
+model. Under gunicorn with `preload_app` (see gunicorn.conf.py) this happens in
+the master before forking, so workers share the pages instead of each loading
+their own copy.
+
+geopandas is only imported when the GeoDataFrame is first asked for; the
+model needs just the attribute columns.
+"""
+import os
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+NOISE_PATH = "data/lden.ftr"
+
+_table: Optional[pa.Table] = None
+_columns: Optional[dict] = None
+_gdf = None
+
+
+def data_version(path: str = NOISE_PATH) -> str:
+    """Cheap fingerprint of the noise file; changes when the file is replaced."""
+    return f"{os.path.getmtime(path):.0f}-{os.path.getsize(path)}"
+
+
+def noise_table() -> pa.Table:
+    """Memory-mapped Arrow table of the Feather file (loaded once)."""
+    global _table
+    if _table is None:
+        _table = feather.read_table(pa.memory_map(NOISE_PATH), memory_map=True).combine_chunks()
+    return _table
+
+
+def noise_columns() -> dict:
+    """Read-only NumPy views of the attribute columns, backed by the mapping."""
+    global _columns
+    if _columns is None:
+        table = noise_table()
+        _columns = {
+            name: table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+            for name in table.column_names
+            if name != "geometry" and not name.startswith("__")
+        }
+    return _columns
+
+
+def noise_gdf():
+    """The noise GeoDataFrame (geometry, aantalInwoners, diff), built once.
+
+    Attribute columns share memory with `noise_columns()`; treat the frame as
+    read-only.
+    """
+    global _gdf
+    if _gdf is None:
+        try:
+            import geopandas as gpd
+        except Exception:
+            return None
+        table = noise_table()
+        # split_blocks keeps single-chunk numeric columns as zero-copy views
+        df = table.drop_columns(["geometry"]).to_pandas(split_blocks=True)
+        df["geometry"] = gpd.GeoDataFrame.from_arrow(table.select(["geometry"])).geometry.values
+        _gdf = gpd.GeoDataFrame(df, geometry="geometry", copy=False)
+    return _gdf
+
@@ -0,0 +1,178 @@
+"""Inverse questions on the batch model: which inputs meet given KPI targets.
+
+    solve({"people_worse": (None, 200_000), "jobs_direct": (350_000, None)})
+    pareto({"jobs_direct": (350_000, None)})
+
+Constraints map a compute_batch output to (min, max); None leaves that side
+open. For fixed shares (freight, short haul, medium haul) every KPI is
+monotone in the number of slots: the economic totals are linear, the noise
+delta grows with the log of the movement energy and the people counts are
+step functions of that delta. Each constraint therefore allows a prefix or a
+suffix of the slot range, found for all share combinations at once by a
+vectorized bisection over slot steps. The objective is monotone in slots as
+well, so per share combination its optimum is one end of the feasible
+interval.
+
+`solve` searches the share grid at `step` points, then refines around the
+best `top` results at 1 point. `pareto` evaluates the share grid at
+`slot_levels` slot values and keeps the scenarios no other feasible scenario
+beats on both axes (added value up, noise impact down by default).
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from logic import model
+from logic.sweep import METRICS, PARAMS, base_scenario
+
+SHARES = ("freight_pct", "short_pct", "medium_pct")
+BOUNDS = dict(slots=(0, 1_000_000), freight_pct=(0, 100), short_pct=(0, 100), medium_pct=(0, 100))
+SLOT_STEP = 1000  # resolution of the slots in results
+STEP = 5  # share grid (points) before refinement
+
+
+def _bounds(bounds):
+    out = dict(BOUNDS)
+    out.update(bounds or {})
+    unknown = set(out) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"cannot search {sorted(unknown)}; choose from {PARAMS}")
+    return out
+
+
+def _check_constraints(constraints):
+    known = set(METRICS) | {"slots"}
+    unknown = set(constraints) - known
+    if unknown:
+        raise ValueError(f"unknown KPIs {sorted(unknown)}; choose from {sorted(known)}")
+
+
+def share_grid(bounds=None, step=STEP) -> np.ndarray:
+    """(freight, short, medium) rows on a `step` grid within `bounds`, with
+    short + medium <= 100. Both ends of every range are included."""
+    bounds = _bounds(bounds)
+
+    def axis(p):
+        lo, hi = bounds[p]
+        return np.unique(np.append(np.arange(lo, hi + 1, step), hi))
+
+    grid = np.array(list(itertools.product(*(axis(p) for p in SHARES))), dtype=np.int64).reshape(-1, 3)
+    return grid[grid[:, 1] + grid[:, 2] <= 100]
+
+
+def _neighbours(shares, radius, bounds):
+    # All share rows within `radius` points of the given rows, deduplicated
+    offsets = np.array(list(itertools.product(range(-radius, radius + 1), repeat=3)))
+    rows = (shares[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+    lo = np.array([bounds[p][0] for p in SHARES]); hi = np.array([bounds[p][1] for p in SHARES])
+    rows = rows[np.all((rows >= lo) & (rows <= hi), axis=1) & (rows[:, 1] + rows[:, 2] <= 100)]
+    return np.unique(rows, axis=0)
+
+
+def _evaluate(k, shares, path, slot_step):
+    return model.compute_batch(k * slot_step, shares[:, 0], shares[:, 1], shares[:, 2], path)
+
+
+def _satisfies(out, constraints):
+    ok = np.ones(len(out["slots"]), dtype=bool)
+    for metric, (lo, hi) in constraints.items():
+        if lo is not None:
+            ok &= out[metric] >= lo
+        if hi is not None:
+            ok &= out[metric] <= hi
+    return ok
+
+
+def slot_intervals(shares, constraints, bounds=None, slot_step=SLOT_STEP, path=None):
+    """Feasible slots per share row: (lowest, highest, feasible) arrays, slots
+    in multiples of `slot_step` within the slots bounds."""
+    _check_constraints(constraints)
+    bounds = _bounds(bounds)
+    path = path if path is not None else base_scenario()["path"]
+    n = len(shares)
+    k_lo = np.full(n, -(-bounds["slots"][0] // slot_step), dtype=np.int64)
+    k_hi = np.full(n, bounds["slots"][1] // slot_step, dtype=np.int64)
+    lowest, highest, feasible = k_lo.copy(), k_hi.copy(), k_lo <= k_hi
+
+    for metric, (lo, hi) in constraints.items():
+        for bound in ((lo, None), (None, hi)):
+            if bound == (None, None):
+                continue
+            one = {metric: bound}
+
+            def holds(k, rows):
+                return _satisfies(_evaluate(k, shares[rows], path, slot_step), one)
+
+            everything = np.arange(n)
+            at_lo, at_hi = holds(k_lo, everything), holds(k_hi, everything)
+            feasible &= at_lo | at_hi
+            # Monotone in slots: the bound holds on a prefix (at_lo only) or a
+            # suffix (at_hi only). Bisect for the switch point where it holds
+            # at exactly one end: `a` keeps the side equal to the low end.
+            rows = np.flatnonzero(at_lo != at_hi)
+            a, b, side = k_lo[rows].copy(), k_hi[rows].copy(), at_lo[rows]
+            active = np.flatnonzero(b - a > 1)
+            while len(active):
+                mid = (a[active] + b[active]) // 2
+                same = holds(mid, rows[active]) == side[active]
+                a[active] = np.where(same, mid, a[active])
+                b[active] = np.where(same, b[active], mid)
+                active = active[b[active] - a[active] > 1]
+            prefix = rows[side]; suffix = rows[~side]
+            highest[prefix] = np.minimum(highest[prefix], a[side])
+            lowest[suffix] = np.maximum(lowest[suffix], b[~side])
+
+    feasible &= lowest <= highest
+    return lowest * slot_step, highest * slot_step, feasible
+
+
+def _candidates(shares, constraints, objective, maximize, bounds, slot_step, path):
+    # Best end of the feasible slot interval of every share row
+    lowest, highest, feasible = slot_intervals(shares, constraints, bounds, slot_step, path)
+    shares = shares[feasible]
+    ends = [_evaluate(k // slot_step, shares, path, slot_step) for k in (lowest[feasible], highest[feasible])]
+    take_high = ends[1][objective] >= ends[0][objective] if maximize else ends[1][objective] <= ends[0][objective]
+    return {k: np.where(take_high, ends[1][k], ends[0][k]) for k in PARAMS + ("path",) + METRICS}
+
+
+def _rank(results, objective, maximize, top):
+    df = pd.DataFrame(results)
+    df = df.sort_values([objective, "va_direct"], ascending=[not maximize, False], kind="stable")
+    return df.drop_duplicates(list(PARAMS)).head(top).reset_index(drop=True)
+
+
+def solve(constraints, objective="slots", maximize=True, bounds=None, step=STEP, slot_step=SLOT_STEP, top=5, path=None) -> pd.DataFrame:
+    """The `top` scenarios (inputs + METRICS) optimizing `objective` under
+    `constraints`, best first; empty when nothing is feasible. Ties are
+    broken by direct added value."""
+    _check_constraints({objective: (None, None)})
+    bounds = _bounds(bounds)
+    found = _candidates(share_grid(bounds, step), constraints, objective, maximize, bounds, slot_step, path)
+    best = _rank(found, objective, maximize, top)
+    if best.empty or step <= 1:
+        return best
+    around = _neighbours(best[list(SHARES)].to_numpy(dtype=np.int64), step - 1, bounds)
+    refined = _candidates(around, constraints, objective, maximize, bounds, slot_step, path)
+    return _rank({k: np.concatenate([found[k], refined[k]]) for k in found}, objective, maximize, top)
+
+
+def pareto(constraints=None, x="va_direct", y="people_worse", bounds=None, step=STEP, slot_levels=41,
+           slot_step=SLOT_STEP, path=None) -> pd.DataFrame:
+    """Feasible scenarios not dominated on (`x` higher, `y` lower), sorted by `x`."""
+    constraints = constraints or {}
+    _check_constraints({**constraints, x: (None, None), y: (None, None)})
+    bounds = _bounds(bounds)
+    path = path if path is not None else base_scenario()["path"]
+    shares = share_grid(bounds, step)
+    slots = np.unique(np.round(np.linspace(*bounds["slots"], slot_levels) / slot_step).astype(np.int64))
+    k = np.repeat(slots, len(shares))
+    out = _evaluate(k, np.tile(shares, (len(slots), 1)), path, slot_step)
+    keep = _satisfies(out, constraints)
+    df = pd.DataFrame({c: out[c][keep] for c in PARAMS + ("path",) + METRICS})
+    # Best x first (lowest y among equal x); a scenario is on the frontier
+    # when its y is below that of every scenario before it
+    df = df.sort_values([x, y], ascending=[False, True], kind="stable")
+    values = df[y].to_numpy()
+    prev_min = np.minimum.accumulate(np.concatenate([[np.inf], values[:-1]]))
+    return df[values < prev_min].sort_values(x).reset_index(drop=True)
@@ -0,0 +1,91 @@
+"""Persistent, shareable scenarios.
+
+A shared scenario is stored in a SQLite file under the id `scenario_id`
+gives it: a short hash of its normalized inputs and name, so sharing the
+same scenario twice yields the same link. Next to the inputs the row keeps
+the model result and the rendered outputs (figure JSON, KPI texts) of the
+moment it was shared, tagged with the model version (see
+logic.model.model_version). Opening the link serves those directly while
+the version matches; after a change of coefficients or noise data only
+the inputs are reused and the results are computed again.
+
+The file is shared by all gunicorn workers; set its path with
+MAINPORT_SCENARIO_DB (default data/.cache/scenarios.sqlite).
+"""
+import base64
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_PATH = os.path.join("data", ".cache", "scenarios.sqlite")
+ID_BYTES = 9  # 12 url-safe characters
+
+
+def scenario_id(inputs, name="") -> str:
+    """Compact content hash of normalized inputs (a tuple) and a name."""
+    digest = hashlib.sha256(json.dumps([list(inputs), name or ""]).encode()).digest()
+    return base64.urlsafe_b64encode(digest[:ID_BYTES]).decode("ascii")
+
+
+class ScenarioStore:
+    """Shared scenarios (inputs, result and rendered outputs) in a SQLite file."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _conn(self):
+        # One connection per thread and process: gunicorn forks preloaded
+        # workers, and a SQLite connection must not cross a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scenarios ("
+                    "id TEXT PRIMARY KEY, name TEXT, inputs TEXT, version TEXT, "
+                    "result BLOB, outputs BLOB, created REAL)"
+                )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def save(self, inputs, name, version, result, outputs) -> str:
+        """Store a scenario and return its id. `outputs` must be JSON-serializable."""
+        sid = scenario_id(inputs, name)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scenarios VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sid, name, json.dumps(list(inputs)), version,
+                 pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+                 zlib.compress(json.dumps(outputs).encode()), time.time()),
+            )
+        return sid
+
+    def load(self, sid, version=None):
+        """The stored scenario as a dict (id, name, inputs, created, and result
+        and outputs unless `version` is given and differs), or None."""
+        try:
+            row = self._conn().execute(
+                "SELECT name, inputs, version, result, outputs, created FROM scenarios WHERE id = ?", (sid,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        name, inputs, stored_version, result, outputs, created = row
+        scenario = dict(id=sid, name=name, inputs=tuple(json.loads(inputs)), created=created)
+        if version is None or version == stored_version:
+            scenario.update(result=pickle.loads(result), outputs=json.loads(zlib.decompress(outputs)))
+        return scenario
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
@@ -0,0 +1,119 @@
+"""Parameter sweeps and sensitivity analysis on the batch model.
+
+A sweep is the cartesian product of value ranges for some of the sidebar
+inputs (PARAMS); the other inputs stay at a base scenario (DEFAULTS unless
+given). Grids are evaluated in chunks with `model.compute_batch`, so the
+combinations are never materialized all at once and results can be streamed:
+
+    for df in iter_sweep(dict(freight_pct=range(0, 31), short_pct=range(0, 61))):
+        ...
+
+With `workers` > 1 the chunks are spread over a ProcessPoolExecutor; results
+still arrive in grid order. The noise KPIs are cumulative sums over the
+polygons sorted once at import, so they vectorize like the rest and the pool
+only pays off for large grids.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from logic import model
+
+PARAMS = ("slots", "freight_pct", "short_pct", "medium_pct")
+# DEFAULTS keys of the sidebar inputs
+_DEFAULT_KEYS = dict(slots="slots", freight_pct="freight_share", short_pct="short_pct", medium_pct="medium_pct")
+METRICS = (
+    "va_direct", "va_indirect", "jobs_direct", "jobs_indirect", "homes", "people_worse", "noise_delta",
+    "total_pax", "total_cargo_freight", "total_cargo_belly", "long_pct", "co2",
+)
+CHUNK_SIZE = 50_000
+
+
+def base_scenario(base=None):
+    """The sidebar inputs of `base` (a dict with PARAMS keys, 'path' and
+    optionally 'biofuel_pct'), DEFAULTS otherwise."""
+    scenario = {p: model.DEFAULTS[k] for p, k in _DEFAULT_KEYS.items()}
+    scenario["path"] = model.DEFAULTS["path"]
+    scenario.update(base or {})
+    return scenario
+
+
+def _axes(ranges):
+    unknown = set(ranges) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"cannot sweep {sorted(unknown)}; choose from {PARAMS}")
+    return {p: np.asarray(list(v)) for p, v in ranges.items()}
+
+
+def _chunk(axes, base, start, stop, metrics):
+    # Inputs for grid positions start..stop (C order over the axes) and their results
+    names = list(axes)
+    shape = tuple(len(axes[p]) for p in names)
+    idx = np.unravel_index(np.arange(start, stop), shape)
+    inputs = {p: base[p] for p in PARAMS}
+    inputs.update({p: axes[p][i] for p, i in zip(names, idx)})
+    out = model.compute_batch(*(inputs[p] for p in PARAMS), base["path"], base.get("biofuel_pct"))
+    df = pd.DataFrame({p: out[p] for p in PARAMS})
+    for m in metrics:
+        df[m] = out[m]
+    df.index = pd.RangeIndex(start, stop)
+    return df
+
+
+def iter_sweep(ranges, base=None, chunk_size=CHUNK_SIZE, workers=None, metrics=METRICS):
+    """Yield DataFrames (inputs + `metrics`) for the grid spanned by `ranges`,
+    `chunk_size` rows at a time. `ranges` maps PARAMS names to value sequences.
+    `workers` > 1 evaluates chunks in that many processes (0: one per CPU)."""
+    axes = _axes(ranges)
+    base = base_scenario(base)
+    total = int(np.prod([len(v) for v in axes.values()])) if axes else 1
+    bounds = [(i, min(i + chunk_size, total)) for i in range(0, total, chunk_size)]
+    if workers == 0:
+        workers = os.cpu_count()
+    if not workers or workers < 2 or len(bounds) < 2:
+        for start, stop in bounds:
+            yield _chunk(axes, base, start, stop, metrics)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        n = len(bounds)
+        yield from pool.map(
+            _chunk, itertools.repeat(axes, n), itertools.repeat(base, n),
+            [b[0] for b in bounds], [b[1] for b in bounds], itertools.repeat(metrics, n),
+        )
+
+
+def sweep(ranges, base=None, chunk_size=CHUNK_SIZE, workers=None, metrics=METRICS) -> pd.DataFrame:
+    """All of `iter_sweep` in one DataFrame."""
+    return pd.concat(list(iter_sweep(ranges, base, chunk_size, workers, metrics)))
+
+
+def tornado(ranges, metric="va_direct", base=None) -> pd.DataFrame:
+    """One-at-a-time sensitivity: `metric` with each parameter at the low and
+    high end of its range (`ranges`: name -> (low, high)), the rest at base.
+    Sorted by swing, largest first."""
+    base = base_scenario(base)
+    unknown = set(ranges) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"cannot vary {sorted(unknown)}; choose from {PARAMS}")
+    names = list(ranges)
+    # row 0 is the base scenario, then (low, high) per parameter
+    inputs = {p: np.full(1 + 2 * len(names), base[p]) for p in PARAMS}
+    for i, name in enumerate(names):
+        inputs[name][1 + 2 * i], inputs[name][2 + 2 * i] = ranges[name]
+    values = model.compute_batch(*(inputs[p] for p in PARAMS), base["path"], base.get("biofuel_pct"))[metric]
+    df = pd.DataFrame(dict(
+        parameter=names,
+        low=[ranges[n][0] for n in names], high=[ranges[n][1] for n in names],
+        base_value=values[0], low_value=values[1::2], high_value=values[2::2],
+    ))
+    df["swing"] = (df["high_value"] - df["low_value"]).abs()
+    return df.sort_values("swing", ascending=False, ignore_index=True)
+
+
+def heatmap(x, x_values, y, y_values, metric="jobs_direct", base=None) -> pd.DataFrame:
+    """`metric` over the grid of two parameters: rows are `y_values`, columns `x_values`."""
+    df = sweep({y: y_values, x: x_values}, base, metrics=(metric,))
+    return df.pivot(index=y, columns=x, values=metric)
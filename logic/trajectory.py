@@ -0,0 +1,74 @@
+"""Year-by-year trajectories on the batch model.
+
+    trajectory(440_000, 5, 40, 30, slot_growth=[0, 1.5], target_short_pct=30)
+
+Every scenario starts from the dashboard inputs in the first year of `years`.
+Slots grow by `slot_growth` percent per year (compound); the shares (fleet
+mix) and the biofuel share move linearly from their start value to their
+target, reached in `target_year` (default: the last year) and kept after it.
+A target left at None keeps the start value. Arguments are scalars or
+sequences of S scenarios.
+
+All scenario-years are evaluated in one compute_batch pass: the inputs are
+built as (S, years) arrays, flattened and the results reshaped, so KPIs come
+back as (S, years) and segment results as (S, years, segments). Inputs are
+not rounded; for whole-numbered inputs a year equals compute_all on them.
+"""
+import numpy as np
+import pandas as pd
+
+from logic import model
+from logic.sweep import METRICS, PARAMS
+
+YEARS = np.arange(2025, 2051)
+SEGMENT_RESULTS = ("seg_slots", "seg_added_value", "seg_jobs", "seg_pax", "seg_cargo", "seg_co2")
+
+
+def _column(values, n):
+    return np.broadcast_to(np.nan_to_num(np.asarray(values, dtype=float)), (n,))[:, None]
+
+
+def _ramp(years, target_year):
+    # Fraction of the way from start to target per year: 0 in the first year, 1 from target_year
+    span = max(float(target_year - years[0]), 1.0)
+    return np.clip((years - years[0]) / span, 0.0, 1.0)[None, :]
+
+
+def trajectory(slots, freight_pct, short_pct, medium_pct, slot_growth=0.0,
+               target_freight_pct=None, target_short_pct=None, target_medium_pct=None,
+               biofuel_pct=None, target_biofuel_pct=None, years=YEARS, target_year=None, path_name=None) -> dict:
+    """Inputs and compute_batch outputs per scenario and year, plus `year` (years,)."""
+    years = np.asarray(years, dtype=np.int64)
+    biofuel_pct = model.DEFAULTS["biofuel_pct"] if biofuel_pct is None else biofuel_pct
+    starts = dict(freight_pct=freight_pct, short_pct=short_pct, medium_pct=medium_pct, biofuel_pct=biofuel_pct)
+    targets = dict(freight_pct=target_freight_pct, short_pct=target_short_pct, medium_pct=target_medium_pct,
+                   biofuel_pct=target_biofuel_pct)
+    n = np.broadcast(*(np.asarray(v, dtype=object) for v in (slots, slot_growth, *starts.values(), *targets.values(),
+                                                              path_name))).size
+    ramp = _ramp(years, years[-1] if target_year is None else target_year)
+
+    inputs = {}
+    for k, start in starts.items():
+        start = _column(start, n)
+        target = start if targets[k] is None else _column(targets[k], n)
+        inputs[k] = np.clip(start + (target - start) * ramp, 0, 100)
+    growth = 1 + _column(slot_growth, n) / 100
+    inputs["slots"] = _column(slots, n) * growth ** (years - years[0])[None, :]
+
+    shape = (n, len(years))
+    paths = np.repeat(np.broadcast_to(np.asarray(path_name if path_name is not None else model.DEFAULTS["path"],
+                                                 dtype=object), (n,)), len(years))
+    out = model._batch(*(inputs[k].ravel() for k in PARAMS), paths, inputs["biofuel_pct"].ravel())
+    result = {k: v.reshape(shape + v.shape[1:]) for k, v in out.items()}
+    result["year"] = years
+    return result
+
+
+def to_frame(result, names=None) -> pd.DataFrame:
+    """Long table of a trajectory: one row per scenario and year with the
+    inputs, biofuel_pct and METRICS. `names` label the scenarios (default 0..S-1)."""
+    n, y = result["slots"].shape
+    names = list(range(n)) if names is None else list(names)
+    columns = dict(scenario=np.repeat(names, y), year=np.tile(result["year"], n))
+    columns.update({k: result[k].ravel() for k in PARAMS + ("biofuel_pct",) + METRICS})
+    return pd.DataFrame(columns)
@@ -0,0 +1,131 @@
+"""Monte Carlo uncertainty bands for the economic KPIs.
+
+The per-slot coefficients come from point estimates in
+haul_distributions.xlsx and economische_factoren.xlsx. Here every input cell
+the coefficients use is multiplied by a random factor with median 1, drawn
+from the distribution configured for its column (DISTRIBUTIONS). All samples
+go through `model.coefficient_matrix` at once, giving a (samples, segments,
+quantities) array; a scenario then costs one contraction with its segment
+slots plus the percentiles.
+
+Samples are seeded and cached per configuration, so bands do not jitter
+between interactions. Noise KPIs do not depend on these coefficients and have
+no band.
+"""
+import functools
+
+import numpy as np
+
+from logic import model
+
+N_SAMPLES = 20_000
+QUANTILES = (5, 50, 95)
+
+# Column -> (distribution, spread) of the multiplicative factor on each cell:
+#   ("normal", sd)          relative standard deviation, clipped at 0
+#   ("lognormal", sigma)    sigma of log(factor)
+#   ("uniform", half)       1 - half .. 1 + half
+#   ("triangular", half)    same bounds, mode 1
+# Columns not listed are kept at their point estimate.
+DISTRIBUTIONS = {
+    "num_passengers": ("normal", 0.05),
+    "frac_tourist": ("normal", 0.10),
+    "frac_business": ("normal", 0.10),
+    "cargo_volume": ("normal", 0.10),
+    "added_value_schiphol": ("lognormal", 0.15),
+    "added_value_tourist": ("lognormal", 0.25),
+    "added_value_business": ("lognormal", 0.25),
+    "employment_schiphol": ("lognormal", 0.15),
+    "employment_tourist": ("lognormal", 0.25),
+    "employment_business": ("lognormal", 0.25),
+}
+
+_HAUL_COLUMNS = ("num_passengers", "frac_tourist", "frac_business", "cargo_volume")
+_FRACTIONS = ("frac_tourist", "frac_business")
+_SAMPLE_CACHE = {}
+
+
+def _factors(rng, spec, shape):
+    if spec is None:
+        return np.ones(shape)
+    kind, spread = spec
+    if kind == "normal":
+        return np.maximum(rng.normal(1.0, spread, shape), 0.0)
+    if kind == "lognormal":
+        return rng.lognormal(0.0, spread, shape)
+    if kind == "uniform":
+        return rng.uniform(1 - spread, 1 + spread, shape)
+    if kind == "triangular":
+        return rng.triangular(1 - spread, 1.0, 1 + spread, shape)
+    raise ValueError(f"unknown distribution {kind!r}")
+
+
+def sample_coefficients(n=N_SAMPLES, distributions=None, seed=0) -> np.ndarray:
+    """(n, len(SEGMENTS), len(COEF_COLUMNS)) coefficient samples."""
+    distributions = DISTRIBUTIONS if distributions is None else distributions
+    rng = np.random.default_rng(seed)
+    rows = model.haul_dist.loc[model.SEGMENT_ROWS]
+    haul = {}
+    for col in _HAUL_COLUMNS:
+        values = rows[col].to_numpy(dtype=float) * _factors(rng, distributions.get(col), (n, len(rows)))
+        haul[col] = np.minimum(values, 1.0) if col in _FRACTIONS else values
+    econ = {}
+    for row in ("pax", "cargo"):
+        factors = model.econ_fact.loc[row]
+        econ[row] = {col: factors[col] * _factors(rng, distributions.get(col), (n, 1)) for col in factors.index}
+    return model.coefficient_matrix(
+        haul["num_passengers"], haul["frac_tourist"], haul["frac_business"], haul["cargo_volume"],
+        econ["pax"], econ["cargo"],
+    )
+
+
+def coefficient_samples(n=N_SAMPLES, distributions=None, seed=0) -> np.ndarray:
+    """Cached `sample_coefficients`; treat the result as read-only."""
+    key = (n, repr(sorted((DISTRIBUTIONS if distributions is None else distributions).items())), seed)
+    if key not in _SAMPLE_CACHE:
+        _SAMPLE_CACHE.clear()  # one configuration at a time is plenty
+        _cached_bands.cache_clear()
+        _SAMPLE_CACHE[key] = sample_coefficients(n, distributions, seed)
+    return _SAMPLE_CACHE[key]
+
+
+def kpi_bands(slots, freight_pct, short_pct, medium_pct, quantiles=QUANTILES, n=N_SAMPLES, distributions=None, seed=0):
+    """Percentiles (`quantiles`, first axis) of the economic KPIs of one scenario.
+
+    Scalar KPIs have shape (len(quantiles),), the per-segment ones (`seg_*`)
+    (len(quantiles), len(SEGMENTS)) in SEGMENTS order. Results for the default
+    distributions are cached per normalized input; do not modify them.
+    """
+    key = model.normalize_inputs(slots, freight_pct, short_pct, medium_pct, None)[:4]
+    if distributions is None:
+        return _cached_bands(*key, tuple(quantiles), n, seed)
+    return _bands(*key, quantiles, n, distributions, seed)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_bands(slots, freight_pct, short_pct, medium_pct, quantiles, n, seed):
+    return _bands(slots, freight_pct, short_pct, medium_pct, quantiles, n, None, seed)
+
+
+def _bands(slots, freight_pct, short_pct, medium_pct, quantiles, n, distributions, seed):
+    seg_slots, _ = model._segment_slots(*(np.array([v]) for v in (slots, freight_pct, short_pct, medium_pct)))
+    # (samples, segments, quantities)
+    seg = coefficient_samples(n, distributions, seed) * seg_slots[0][None, :, None]
+    seg[:, :, 2:] /= 1000000
+    pax_segments = model._IS_PAX
+    va_direct = seg[:, :, 0].sum(axis=1)
+    jobs_direct = seg[:, :, 1].sum(axis=1)
+    samples = dict(
+        va_direct=va_direct / 1000000,
+        va_indirect=va_direct * (model.INDIRECT_MULT - 1) / 1000000,
+        jobs_direct=np.trunc(jobs_direct),
+        jobs_indirect=np.trunc(jobs_direct * (model.INDIRECT_MULT - 1)),
+        total_pax=seg[:, pax_segments, 2].sum(axis=1),
+        total_cargo_freight=seg[:, ~pax_segments, 3].sum(axis=1),
+        total_cargo_belly=seg[:, pax_segments, 3].sum(axis=1),
+    )
+    bands = {k: np.percentile(v, quantiles) for k, v in samples.items()}
+    seg_bands = np.percentile(seg, quantiles, axis=0)  # (quantiles, segments, quantities)
+    for j, name in enumerate(("seg_added_value", "seg_jobs", "seg_pax", "seg_cargo")):
+        bands[name] = seg_bands[:, :, j]
+    return bands
@@ -0,0 +1,227 @@
+"""Read-only scenario evaluation API on the Flask server.
+
+    GET/POST <prefix>api/scenario     one scenario (query args or JSON object)
+    POST     <prefix>api/scenarios    a batch (JSON or an Arrow IPC stream)
+
+Inputs are the sidebar parameters (`slots`, `freight_pct`, `short_pct`,
+`medium_pct`, `path`, `biofuel_pct`); missing ones default to DEFAULTS. A
+single scenario goes through `compute_all`, so it shares RESULT_CACHE with
+the dashboard callbacks. A batch is evaluated in one `compute_batch` call.
+Inputs must be finite and within LIMITS; anything else is a 400.
+
+A batch is sent as a list of objects, as columns (`{"slots": [...], ...}`)
+or as an Arrow IPC stream (Content-Type ARROW_MIMETYPE) with those columns.
+Results are JSON columns for up to ARROW_MIN_ROWS scenarios and an Arrow IPC
+stream above that; an Accept header naming either format overrides the
+size rule. Timings of every request are reported in the Server-Timing
+header by services.metrics.
+"""
+import io
+
+import numpy as np
+
+from logic import model
+from logic.optimize import BOUNDS
+from logic.sweep import METRICS, PARAMS, base_scenario
+from services.metrics import span
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+ARROW_MIN_ROWS = 1000  # batches this large are answered with Arrow by default
+MAX_BATCH = 2_000_000
+SEGMENT_KEYS = ("seg_slots", "seg_added_value", "seg_jobs", "seg_pax", "seg_cargo", "seg_co2")
+INPUTS = PARAMS + ("path", "biofuel_pct")
+# Accepted input ranges (inclusive); shares are percentages
+LIMITS = dict(BOUNDS, slots=(0, 10_000_000), biofuel_pct=(0, 100))
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _number(value, name):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be a number, got {value!r}") from None
+    _check_range(np.array([number]), name)
+    return number
+
+
+def _check_range(values, name):
+    lo, hi = LIMITS[name]
+    if not np.all(np.isfinite(values)):
+        raise BadRequest(f"{name} must be finite numbers")
+    if len(values) and (values.min() < lo or values.max() > hi):
+        raise BadRequest(f"{name} must be between {lo:,} and {hi:,}")
+
+
+def parse_one(values):
+    """Sidebar inputs of a single scenario from a mapping (DEFAULTS for missing keys)."""
+    base = base_scenario()
+    unknown = set(values) - set(INPUTS)
+    if unknown:
+        raise BadRequest(f"unknown inputs {sorted(unknown)}; use {list(INPUTS)}")
+    scenario = {p: _number(values[p], p) if p in values else base[p] for p in PARAMS}
+    scenario["path"] = values.get("path", base["path"])
+    scenario["biofuel_pct"] = _number(values["biofuel_pct"], "biofuel_pct") if "biofuel_pct" in values else model.DEFAULTS["biofuel_pct"]
+    return scenario
+
+
+def parse_batch(body, content_type):
+    """Columns (INPUTS, equal length) of a batch request body."""
+    if content_type == ARROW_MIMETYPE:
+        import pyarrow as pa
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+            columns = {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+        except (pa.ArrowException, ValueError, TypeError):
+            raise BadRequest("request body is not a valid Arrow IPC stream") from None
+    else:
+        data = _loads(body)
+        if isinstance(data, dict) and "scenarios" in data:
+            data = data["scenarios"]
+        if isinstance(data, list):
+            if not all(isinstance(row, dict) for row in data):
+                raise BadRequest("every scenario in the list must be an object")
+            names = set().union(*data) if data else set()
+            base = {"biofuel_pct": model.DEFAULTS["biofuel_pct"], **base_scenario()}
+            columns = {name: [row.get(name, base.get(name)) for row in data] for name in names}
+        elif isinstance(data, dict):
+            if not all(isinstance(v, list) for v in data.values()):
+                raise BadRequest("every column must be a list of values")
+            columns = data
+        else:
+            raise BadRequest("expected a list of scenarios or a mapping of columns")
+    unknown = set(columns) - set(INPUTS)
+    if unknown:
+        raise BadRequest(f"unknown inputs {sorted(unknown)}; use {list(INPUTS)}")
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        raise BadRequest("all columns must have the same length")
+    n = lengths.pop() if lengths else 0
+    if n > MAX_BATCH:
+        raise BadRequest(f"at most {MAX_BATCH:,} scenarios per request")
+    base = dict(base_scenario(), biofuel_pct=model.DEFAULTS["biofuel_pct"])
+    out = {}
+    for p in PARAMS + ("biofuel_pct",):
+        if p not in columns:
+            out[p] = np.full(n, base[p])
+            continue
+        try:
+            out[p] = np.asarray(columns[p], dtype=float)
+        except (TypeError, ValueError):
+            raise BadRequest(f"{p} must be numbers") from None
+        _check_range(out[p], p)
+    out["path"] = np.asarray(columns["path"], dtype=object) if "path" in columns else np.full(n, base["path"], dtype=object)
+    return out
+
+
+def _loads(body):
+    import json
+    try:
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        raise BadRequest("request body is not valid JSON") from None
+
+
+def _plain(values):
+    # orjson writes contiguous numeric arrays natively; paths are Python strings
+    if isinstance(values, np.ndarray):
+        return values.tolist() if values.dtype == object else np.ascontiguousarray(values)
+    return values
+
+
+def _dumps(data):
+    import json
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, default=lambda o: o.tolist() if isinstance(o, np.ndarray) else o.item()).encode()
+
+
+def scenario_result(scenario):
+    """JSON-ready compute_all outputs (without per-polygon levels unless asked)."""
+    out = model.compute_all(*(scenario[p] for p in INPUTS))
+    result = dict(inputs=dict(zip(INPUTS, model.normalize_inputs(*(scenario[p] for p in INPUTS)))))
+    for key in METRICS:
+        if key in out:
+            result[key] = np.asarray(out[key]).item()
+    result["segments"] = out["seg"].to_dict(orient="records")
+    return result, out
+
+
+def batch_result(columns, segments=False):
+    """compute_batch outputs for a parsed batch: inputs, METRICS and, when
+    `segments`, the per-segment arrays (N x len(SEGMENTS))."""
+    out = model.compute_batch(*(columns[p] for p in INPUTS))
+    keys = INPUTS + METRICS + (SEGMENT_KEYS if segments else ())
+    return {k: out[k] for k in keys}
+
+
+def to_arrow(result):
+    """Arrow IPC stream bytes for a batch_result; per-segment arrays become
+    fixed-size list columns in SEGMENTS order."""
+    import pyarrow as pa
+    arrays, names = [], []
+    for name, values in result.items():
+        if values.ndim == 2:
+            arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1]))
+        else:
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode() if values.dtype == object else pa.array(values))
+        names.append(name)
+    table = pa.Table.from_arrays(arrays, names=names)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _wants_arrow(request, n):
+    best = request.accept_mimetypes.best_match([ARROW_MIMETYPE, "application/json"])
+    if best and request.accept_mimetypes[best] > request.accept_mimetypes["*/*"]:
+        return best == ARROW_MIMETYPE
+    return n > ARROW_MIN_ROWS
+
+
+def init_app(server, prefix="/"):
+    """Register the scenario endpoints on `server` under `prefix`."""
+    from flask import Response, request
+
+    def json_response(data, status=200):
+        return Response(_dumps(data), status=status, mimetype="application/json")
+
+    @server.errorhandler(BadRequest)
+    def _bad_request(error):
+        return json_response(dict(error=str(error)), 400)
+
+    @server.route(f"{prefix}api/scenario", methods=["GET", "POST"])
+    def api_scenario():
+        values = request.args.to_dict() if request.method == "GET" else _loads(request.get_data())
+        if not isinstance(values, dict):
+            raise BadRequest("expected a JSON object with the scenario inputs")
+        values.pop("include", None)
+        include = set(request.args.get("include", "").split(","))
+        scenario = parse_one(values)
+        with span("api.compute_all"):
+            result, out = scenario_result(scenario)
+        if "lden_sim" in include:
+            result["lden_sim"] = _plain(out["lden_sim"])
+        return json_response(result)
+
+    @server.route(f"{prefix}api/scenarios", methods=["POST"])
+    def api_scenarios():
+        with span("api.parse"):
+            columns = parse_batch(request.get_data(), request.mimetype)
+        with span("api.compute_batch"):
+            result = batch_result(columns, segments=request.args.get("segments") == "1")
+        n = len(columns["slots"])
+        with span("api.encode"):
+            if _wants_arrow(request, n):
+                return Response(to_arrow(result), mimetype=ARROW_MIMETYPE)
+            return json_response(dict(count=n, results={k: _plain(v) for k, v in result.items()}))
+
+    return server
@@ -0,0 +1,67 @@
+"""Background callbacks for the heavy analyses, on a local job queue.
+
+`background_callback` registers a Dash background callback: the work runs in
+a separate process started by a DiskcacheManager, so the gunicorn worker
+that received the request is free again right away and the browser polls
+for the result. No broker is involved: jobs, progress and results live in a
+diskcache directory (MAINPORT_JOBS_DIR, default data/.cache/jobs) that all
+workers on the machine share.
+
+- `progress` outputs are updated from the job with `set_progress(...)`,
+  passed as the callback's first argument;
+- a job still running when its inputs change is cancelled by the browser,
+  and `cancel` inputs (e.g. a Cancel button) cancel it explicitly;
+- results are cached in the same directory per input values and model
+  version (logic.model.model_version), so a job finished by any worker is
+  served to all of them without running it again; entries expire after
+  MAINPORT_JOBS_TTL seconds (default one day).
+
+Without diskcache (install dash[diskcache]) background callbacks run as
+ordinary callbacks and `set_progress` does nothing.
+"""
+import functools
+import os
+
+from dash import callback
+
+from logic import model
+
+DEFAULT_DIR = os.path.join("data", ".cache", "jobs")
+BACKGROUND_ARGS = ("progress", "progress_default", "running", "cancel", "cache_args_to_ignore")
+
+
+def _manager():
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError:
+        return None
+    cache = diskcache.Cache(os.environ.get("MAINPORT_JOBS_DIR") or DEFAULT_DIR)
+    return DiskcacheManager(cache, cache_by=[model.model_version],
+                            expire=int(os.environ.get("MAINPORT_JOBS_TTL", 24 * 3600)))
+
+
+MANAGER = _manager()
+
+
+def _no_progress(*_):
+    pass
+
+
+def background_callback(**kwargs):
+    """`dash.callback` as a background job (see the module docstring); takes
+    the same arguments plus the background ones (progress, running, cancel)."""
+    if MANAGER is not None:
+        return callback(background=True, manager=MANAGER, **kwargs)
+    has_progress = kwargs.get("progress") is not None
+    kwargs = {k: v for k, v in kwargs.items() if k not in BACKGROUND_ARGS}
+
+    def register(func):
+        if not has_progress:
+            return callback(**kwargs)(func)
+
+        @functools.wraps(func)
+        def run(*args, **inputs):
+            return func(_no_progress, *args, **inputs)
+        return callback(**kwargs)(run)
+    return register
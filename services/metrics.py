@@ -0,0 +1,228 @@
+"""Timing spans, latency histograms and on-demand profiles for the Dash server.
+
+Code marks its hot paths with `span("name")` (or the `timed` decorator); each
+span feeds a per-name histogram. `init_app(server)` hooks the Flask server:
+
+- every request is a span of its own (`request <route>`); the time between the
+  last callback span and the end of the request is recorded as `serialize`;
+- spans of the current request are returned in a `Server-Timing` header;
+- GET /_metrics returns the aggregated histograms as JSON (or Prometheus text
+  with ?format=prometheus), from localhost only;
+- a request from localhost with the header `X-Mainport-Profile: 1`, or any
+  request when the environment variable MAINPORT_PROFILE is set (1 = all,
+  0.05 = 5% of requests), is sampled by a stack profiler; the last profiles are listed at
+  GET /_metrics/profiles and returned as collapsed stacks (flamegraph input)
+  at /_metrics/profiles/<n>.
+"""
+import collections
+import functools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+PROFILE_HEADER = "X-Mainport-Profile"
+PROFILE_INTERVAL = 0.002  # seconds between stack samples
+LOCAL_ADDRS = ("127.0.0.1", "::1")
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-quantile
+        target, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS_MS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound if bound != float("inf") else self.max_ms
+        return self.max_ms
+
+    def as_dict(self):
+        return dict(
+            count=self.count, mean_ms=self.total_ms / self.count if self.count else 0.0,
+            max_ms=self.max_ms, p50_ms=self.quantile(0.5), p90_ms=self.quantile(0.9), p99_ms=self.quantile(0.99),
+            buckets=dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.counts)),
+        )
+
+
+_lock = threading.Lock()
+_histograms = collections.defaultdict(Histogram)
+_local = threading.local()  # spans and timestamps of the request on this thread
+_profiles = collections.deque(maxlen=20)
+
+
+def record(name, ms):
+    with _lock:
+        _histograms[name].observe(ms)
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans.append((name, ms))
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block under `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        t1 = time.perf_counter()
+        record(name, (t1 - t0) * 1000)
+        _local.last_end = t1
+
+
+def timed(name=None):
+    """Decorator form of `span`; defaults to the function name."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    with _lock:
+        return {name: h.as_dict() for name, h in sorted(_histograms.items())}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+    _profiles.clear()
+
+
+def prometheus_text():
+    lines = ["# TYPE mainport_span_ms histogram"]
+    for name, h in snapshot().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in h["buckets"].items():
+            cumulative += n
+            lines.append(f'mainport_span_ms_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'mainport_span_ms_sum{{span="{label}"}} {h["mean_ms"] * h["count"]}')
+        lines.append(f'mainport_span_ms_count{{span="{label}"}} {h["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval (collapsed stacks)."""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def _profile_rate():
+    try:
+        return float(os.environ.get("MAINPORT_PROFILE") or 0)
+    except ValueError:
+        return 0.0
+
+
+def init_app(server):
+    """Install request spans, Server-Timing, profiling and /_metrics on `server`."""
+    from flask import abort, jsonify, request, Response
+
+    @server.before_request
+    def _start():
+        _local.spans = []
+        _local.start = _local.last_end = time.perf_counter()
+        _local.sampler = None
+        rate = _profile_rate()
+        asked = request.headers.get(PROFILE_HEADER) == "1" and request.remote_addr in LOCAL_ADDRS
+        if asked or (rate and random.random() < rate):
+            _local.sampler = StackSampler(threading.get_ident()).start()
+
+    @server.after_request
+    def _finish(response):
+        start = getattr(_local, "start", None)
+        if start is None:
+            return response
+        now = time.perf_counter()
+        if _local.spans:
+            record("serialize", (now - _local.last_end) * 1000)
+        # route pattern rather than path, so the number of histograms stays bounded
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        record(f"request {route}", (now - start) * 1000)
+        sampler = getattr(_local, "sampler", None)
+        if sampler is not None:
+            _profiles.append(dict(path=request.path, time=time.time(), ms=(now - start) * 1000, stacks=sampler.stop()))
+        response.headers["Server-Timing"] = ", ".join(
+            f'{re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")};dur={ms:.2f}' for name, ms in _local.spans
+        )
+        _local.spans = _local.start = _local.sampler = None
+        return response
+
+    def _local_only():
+        if request.remote_addr not in LOCAL_ADDRS:
+            abort(404)
+
+    @server.route("/_metrics")
+    def _metrics():
+        _local_only()
+        if request.args.get("format") == "prometheus":
+            return Response(prometheus_text(), mimetype="text/plain")
+        return jsonify(snapshot())
+
+    @server.route("/_metrics/profiles")
+    def _profile_list():
+        _local_only()
+        return jsonify([
+            dict(id=i, path=p["path"], time=p["time"], ms=p["ms"], samples=sum(p["stacks"].values()))
+            for i, p in enumerate(_profiles)
+        ])
+
+    @server.route("/_metrics/profiles/<int:n>")
+    def _profile(n):
+        _local_only()
+        if n >= len(_profiles):
+            abort(404)
+        stacks = _profiles[n]["stacks"]
+        return Response("".join(f"{s} {c}\n" for s, c in stacks.most_common()), mimetype="text/plain")
+
+    return server